@@ -0,0 +1,262 @@
+"""Offline benchmarks for the collector hot paths.
+
+Run from the repository root:
+
+    python -m benchmarks.bench                       # print JSON results
+    python -m benchmarks.bench --save-baseline benchmarks/baseline.json
+    python -m benchmarks.bench --baseline benchmarks/baseline.json
+
+Listing parsing runs over the checked-in ``techcrunch_page_*.html`` fixtures;
+the other cases use synthetic corpora whose size grows with ``--scale``.
+End-to-end runs go through ``collector.main`` with a fake HTTP session and
+an in-memory Supabase stub, and ``fetch_flaky`` fetches from a local fake
+server that injects 503s and 429s, so nothing touches the network.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Keep benchmark state out of the real cache
+os.environ.setdefault("FRAUD_CACHE_DIR", tempfile.mkdtemp(prefix="fraud-bench-"))
+
+from benchmarks.fake_http import FakeSession, load_fixtures, synthetic_article_html, synthetic_text
+from benchmarks.stub_supabase import StubClient
+
+DEFAULT_TOLERANCE = 0.20
+MEMORY_SAMPLE = 5  # items replayed under tracemalloc, which is too slow for the whole corpus
+CASES = {}
+
+
+def case(name):
+    def register(setup):
+        CASES[name] = setup
+        return setup
+    return register
+
+
+def scaled_keywords(base, count, seed=7):
+    rng = random.Random(seed)
+    words = [w for kw in base for w in kw.lower().split()] + ["vendor", "wallet", "token", "exploit", "payload"]
+    extra = set()
+    while len(extra) < count - len(base):
+        extra.add(" ".join(rng.sample(words, rng.randint(2, 3))))
+    return list(base) + sorted(extra)
+
+def synthetic_texts(count, keywords, seed=1):
+    rng = random.Random(seed)
+    return [synthetic_text(rng, keywords) for _ in range(count)]
+
+def clean_rows(count, duplicate_rate=0.1, seed=3):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        url_id = rng.randrange(i) if i and rng.random() < duplicate_rate else i
+        rows.append({
+            "id": f"clean-{i:07d}",
+            "raw_id": f"raw-{url_id:07d}",
+            "url": f"https://techcrunch.com/2025/01/01/story-{url_id}/",
+            "created_at": f"2025-01-01T00:{(i // 60) % 60:02d}:{i % 60:02d}.{i:06d}",
+        })
+    return rows
+
+
+@case("listing_parse")
+def _listing_parse(scale):
+    from extract import parse_listing
+    return parse_listing, load_fixtures() * scale
+
+@case("article_extract")
+def _article_extract(scale):
+    from config import KEYWORDS
+    from extract import parse_article
+    chrome = load_fixtures()[0]
+    return parse_article, [synthetic_article_html(chrome, text) for text in synthetic_texts(10 * scale, KEYWORDS)]
+
+@case("extract_keywords")
+def _extract_keywords(scale):
+    from config import KEYWORDS
+    from utils import extract_keywords
+    return (lambda text: extract_keywords(text, KEYWORDS)), synthetic_texts(200 * scale, KEYWORDS)
+
+@case("extract_keywords_2k")
+def _extract_keywords_2k(scale):
+    from config import KEYWORDS
+    from utils import extract_keywords
+    keywords = scaled_keywords(KEYWORDS, 2000)
+    extract_keywords("", keywords)  # compile outside the timed loop
+    return (lambda text: extract_keywords(text, keywords)), synthetic_texts(200 * scale, keywords)
+
+@case("summarize_text")
+def _summarize_text(scale):
+    from config import KEYWORDS
+    from utils import summarize_text
+    return summarize_text, synthetic_texts(200 * scale, KEYWORDS)
+
+@case("score")
+def _score(scale):
+    from config import KEYWORDS
+    from loader import build_clean_row
+    from utils import extract_keywords
+    texts = synthetic_texts(200 * scale, KEYWORDS)
+    found = [extract_keywords(text, KEYWORDS) for text in texts]
+    return (lambda kws: build_clean_row("raw", "summary", kws, "title", "url")), found
+
+@case("dedupe")
+def _dedupe(scale):
+    import collector
+
+    def run(client):
+        collector.supabase = client
+        collector.deduplicate_clean_articles()
+    return run, [StubClient({"clean_articles": clean_rows(1000 * scale)}) for _ in range(3)]
+
+@case("neardup_lookup")
+def _neardup_lookup(scale):
+    from config import KEYWORDS
+    from neardup import NearDuplicateIndex
+
+    # Lookups against an index of 1000 × scale stored articles; cost should barely grow with it
+    index = NearDuplicateIndex(os.path.join(tempfile.mkdtemp(prefix="fraud-bench-neardup-"), "neardup.sqlite3"))
+    for i, text in enumerate(synthetic_texts(1000 * scale, KEYWORDS, seed=5)):
+        index.assign(f"https://example.com/{i}", text, commit=False)
+    index.conn.commit()
+    return index.find, synthetic_texts(200, KEYWORDS, seed=6)
+
+@case("search_query")
+def _search_query(scale):
+    from config import KEYWORDS
+    from search import SearchIndex
+
+    # Ranked queries over 1000 × scale indexed articles: single terms, prefixes, phrases and boolean
+    index = SearchIndex(os.path.join(tempfile.mkdtemp(prefix="fraud-bench-search-"), "search.sqlite3"))
+    index.add_many(
+        {"url": f"https://example.com/{i}", "title": f"Story {i}", "summary": "", "full_text": text}
+        for i, text in enumerate(synthetic_texts(1000 * scale, KEYWORDS, seed=7))
+    )
+    queries = ["ransomware", "phish*", '"data breach"', "fraud NOT malware", '"credential stuffing" OR botnet']
+    return (lambda query: index.search(query, limit=25)), queries * 40
+
+@case("fetch_flaky")
+def _fetch_flaky(scale):
+    import requests
+    from benchmarks.fake_server import FakeServer
+    from config import KEYWORDS
+    from fetcher import Fetcher
+
+    # 10% 503s and 429s above 4 concurrent requests; every URL must still come back
+    server = FakeServer(KEYWORDS, latency=0.005, error_rate=0.1, throttle_above=4, retry_after=0).start()
+    fetcher = Fetcher(workers=8, per_host=8, session=requests.Session(), backoff_base=0.02)
+    urls = [f"{server.url}/2025/01/01/story-{i}/" for i in range(100 * scale)]
+    return (lambda url: fetcher.get(url).raise_for_status()), urls
+
+@case("end_to_end")
+def _end_to_end(scale):
+    import collector
+    import fetcher
+    import supabase_client
+    from config import KEYWORDS
+
+    def run(client):
+        collector.supabase = supabase_client.supabase = client
+        fetcher.make_session = lambda pool_size=fetcher.DEFAULT_WORKERS: FakeSession(KEYWORDS)
+        collector.main(pages=5 * scale, use_seen_index=False, use_http_cache=False)
+    return run, [StubClient() for _ in range(3)]
+
+
+def percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))]
+
+def measure(fn, items, memory=True):
+    latencies = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for item in items:
+            start = time.perf_counter()
+            fn(item)
+            latencies.append(time.perf_counter() - start)
+
+        peak = None
+        if memory:
+            tracemalloc.start()
+            for item in items[:MEMORY_SAMPLE]:
+                fn(item)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    latencies.sort()
+    total = sum(latencies)
+    return {
+        "items": len(items),
+        "total_s": round(total, 6),
+        "throughput_per_s": round(len(items) / total, 3) if total else None,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 4),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 4),
+        "peak_memory_bytes": peak,
+    }
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            continue
+        for metric in ("p50_ms", "p99_ms", "peak_memory_bytes"):
+            old, new = previous.get(metric), current.get(metric)
+            if old and new and new > old * (1 + tolerance):
+                regressions.append({"case": name, "metric": metric, "baseline": old, "current": new, "change": round(new / old - 1, 3)})
+    return regressions
+
+def run(names, scale=1, memory=True):
+    results = {}
+    for name in names:
+        fn, items = CASES[name](scale)
+        results[name] = measure(fn, items, memory=memory)
+        print(f"{name}: p50 {results[name]['p50_ms']} ms, {results[name]['throughput_per_s']}/s", file=sys.stderr)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark collector hot paths offline")
+    parser.add_argument("cases", nargs="*", help=f"Cases to run (default: all): {', '.join(CASES)}")
+    parser.add_argument("--scale", type=int, default=1, help="Multiply synthetic corpus sizes")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc peak-memory pass")
+    parser.add_argument("--output", help="Write JSON results here instead of stdout")
+    parser.add_argument("--baseline", help="Compare against a saved results file; exit 1 on regression")
+    parser.add_argument("--save-baseline", help="Also write the results to this path")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed relative slowdown before flagging a regression")
+    args = parser.parse_args()
+    unknown = [name for name in args.cases if name not in CASES]
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(unknown)}")
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scale": args.scale,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": run(args.cases or list(CASES), scale=args.scale, memory=not args.no_memory),
+    }
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["regressions"] = compare(report["results"], json.load(f), tolerance=args.tolerance)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            f.write(output + "\n")
+    if report.get("regressions"):
+        sys.exit(1)
@@ -0,0 +1,90 @@
+import os
+import random
+import re
+import time
+
+import requests
+
+FIXTURE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE_PATHS = [os.path.join(FIXTURE_DIR, f"techcrunch_page_{n}.html") for n in range(1, 6)]
+
+FILLER_WORDS = (
+    "startup funding round platform users company product market customers growth "
+    "investors cloud security team launch data report engineers app service"
+).split()
+
+
+def load_fixtures():
+    pages = []
+    for path in FIXTURE_PATHS:
+        with open(path, encoding="utf-8") as f:
+            pages.append(f.read())
+    return pages
+
+def synthetic_text(rng, keywords, sentences=40, keyword_rate=0.15):
+    out = []
+    for _ in range(sentences):
+        words = rng.choices(FILLER_WORDS, k=rng.randint(8, 20))
+        if keywords and rng.random() < keyword_rate:
+            words.insert(rng.randrange(len(words)), rng.choice(keywords).lower())
+        out.append(" ".join(words).capitalize() + rng.choice(".!?"))
+    return " ".join(out)
+
+def synthetic_article_html(chrome, text, paragraphs=8):
+    """An article page: fixture chrome around a wp-block-post-content body."""
+    sentences = re.split(r'(?<=[.!?]) +', text)
+    per_paragraph = max(1, len(sentences) // paragraphs)
+    body = "".join(
+        f"<p>{' '.join(sentences[i:i + per_paragraph])}</p>"
+        for i in range(0, len(sentences), per_paragraph)
+    )
+    cut = chrome.index("<main")
+    return f'{chrome[:cut]}<div class="wp-block-post-content">{body}</div>{chrome[cut:]}'
+
+
+class FakeResponse:
+    def __init__(self, url, text, status_code=200, headers=None):
+        self.url = url
+        self.text = text
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    @property
+    def content(self):
+        return self.text.encode("utf-8")
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} for {self.url}", response=self)
+
+
+class FakeSession:
+    """``requests.Session`` stand-in serving the fixtures and synthetic articles.
+
+    Listing URLs (``/page/N/``) cycle through the checked-in fixtures; any
+    other URL gets a deterministic synthetic article seeded from the URL.
+    ``latency`` adds a sleep per request to mimic network round trips.
+    """
+
+    def __init__(self, keywords=(), latency=0.0):
+        self.fixtures = load_fixtures()
+        self.keywords = list(keywords)
+        self.latency = latency
+        self.requests = 0
+
+    def get(self, url, timeout=None, headers=None, **_):
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        match = re.search(r"/page/(\d+)/?$", url)
+        if match:
+            return FakeResponse(url, self.fixtures[(int(match.group(1)) - 1) % len(self.fixtures)])
+        rng = random.Random(url)
+        text = synthetic_text(rng, self.keywords)
+        return FakeResponse(url, synthetic_article_html(self.fixtures[0], text))
+
+    def mount(self, *_):
+        pass
+
+    def close(self):
+        pass
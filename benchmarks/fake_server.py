@@ -0,0 +1,141 @@
+"""Local HTTP server with injectable faults, for exercising the fetcher.
+
+    python -m benchmarks.fake_server --error-rate 0.2 --throttle-above 4
+
+Serves the same pages as ``fake_http.FakeSession`` (listing fixtures under
+``/page/N/``, a synthetic article for any other path) over real sockets, so
+timeouts, retries, ``Retry-After`` handling and concurrency limits can be
+tested without touching the network.
+"""
+import argparse
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.fake_http import load_fixtures, synthetic_article_html, synthetic_text
+
+
+class FakeServer:
+    """Threaded HTTP server on localhost.
+
+    ``error_rate`` answers that fraction of requests with a 503;
+    ``throttle_above`` answers with a 429 (and ``Retry-After``) whenever more
+    than that many requests are in flight; ``latency`` delays every
+    response. ``fail_first`` answers the first that many requests with a
+    503, and any path under ``/redirect-loop/`` redirects to itself.
+    ``stats`` counts what was served and the peak concurrency.
+    """
+
+    def __init__(self, keywords=(), latency=0.0, error_rate=0.0, throttle_above=None, retry_after=1, fail_first=0, seed=0, port=0):
+        self.fixtures = load_fixtures()
+        self.keywords = list(keywords)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_above = throttle_above
+        self.retry_after = retry_after
+        self.fail_first = fail_first
+        self.stats = {"requests": 0, "ok": 0, "errors": 0, "throttled": 0, "redirects": 0, "max_in_flight": 0}
+        self._rng = random.Random(seed)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def page(self, path):
+        match = re.search(r"/page/(\d+)/?$", path)
+        if match:
+            return self.fixtures[(int(match.group(1)) - 1) % len(self.fixtures)]
+        return synthetic_article_html(self.fixtures[0], synthetic_text(random.Random(path), self.keywords))
+
+    def respond(self, path):
+        """(status, headers, body) for one request, applying the configured faults."""
+        with self._lock:
+            self.stats["requests"] += 1
+            self._in_flight += 1
+            self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self._in_flight)
+            throttled = self.throttle_above is not None and self._in_flight > self.throttle_above
+            failed = not throttled and (self.stats["requests"] <= self.fail_first or self._rng.random() < self.error_rate)
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            if path.startswith("/redirect-loop/"):
+                self._count("redirects")
+                return 302, {"Location": path}, b""
+            if throttled:
+                self._count("throttled")
+                return 429, {"Retry-After": str(self.retry_after)}, b"slow down"
+            if failed:
+                self._count("errors")
+                return 503, {}, b"unavailable"
+            self._count("ok")
+            return 200, {"Content-Type": "text/html; charset=utf-8"}, self.page(path).encode("utf-8")
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                status, headers, body = server.respond(self.path)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    from config import KEYWORDS
+
+    parser = argparse.ArgumentParser(description="Serve fixture and synthetic pages with injectable faults")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--throttle-above", type=int, help="Answer 429 when more requests than this are in flight")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with each 429")
+    args = parser.parse_args()
+
+    server = FakeServer(KEYWORDS, latency=args.latency, error_rate=args.error_rate,
+                        throttle_above=args.throttle_above, retry_after=args.retry_after, port=args.port)
+    print(f"Serving on {server.url} (Ctrl+C to stop)")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        print(server.stats)
@@ -0,0 +1,80 @@
+"""Import-time budget check.
+
+    python -m benchmarks.import_time
+    python -m pytest tests/test_import_time.py    # the same check as a test, budgets x IMPORT_TIME_SCALE (default 2)
+
+Imports each module in a fresh interpreter under ``python -X importtime``,
+without Supabase credentials, and fails if the cumulative import time goes
+over its budget or if a heavy dependency is pulled in eagerly.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import time allowed per module, in milliseconds
+BUDGETS_MS = {
+    "collector": 250,
+    "supabase_client": 60,
+    "models": 60,
+    "loader": 80,
+    "frontier": 80,
+    "neardup": 80,
+    "search": 80,
+    # Dashboard cold start: pandas and Streamlit are needed at import, nothing heavier is
+    "dashboard_data": 1500,
+}
+
+# Packages that must only be imported on first use
+DEFERRED = ("supabase", "sklearn", "joblib", "pandas", "streamlit", "matplotlib", "seaborn", "networkx", "numpy")
+
+# Deferred packages a module may import eagerly because it cannot work without them
+REQUIRED = {
+    "dashboard_data": ("pandas", "streamlit", "numpy"),
+}
+
+
+def import_profile(module):
+    env = {k: v for k, v in os.environ.items() if k not in ("SUPABASE_URL", "SUPABASE_KEY")}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    cumulative_us, loaded = None, set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        loaded.add(name.strip().split(".")[0])
+        if name == " " + module:  # top-level entry, not a nested import
+            cumulative_us = int(cumulative)
+    return cumulative_us / 1000, loaded
+
+def check(budgets, repeat=3):
+    failures = []
+    for module, budget in budgets.items():
+        runs = [import_profile(module) for _ in range(repeat)]
+        best = min(ms for ms, _ in runs)
+        eager = sorted(set(DEFERRED) & runs[0][1] - set(REQUIRED.get(module, ())))
+        status = "✅" if best <= budget and not eager else "❌"
+        print(f"{status} {module}: {best:.1f} ms (budget {budget} ms){' eager: ' + ', '.join(eager) if eager else ''}")
+        if best > budget:
+            failures.append(f"{module} imports in {best:.1f} ms, over its {budget} ms budget")
+        if eager:
+            failures.append(f"{module} eagerly imports {', '.join(eager)}")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Enforce import-time budgets")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget (e.g. 2 on slow CI hosts)")
+    parser.add_argument("--repeat", type=int, default=3, help="Imports per module; the fastest run counts")
+    args = parser.parse_args()
+
+    failures = check({m: b * args.scale for m, b in BUDGETS_MS.items()}, repeat=args.repeat)
+    if failures:
+        sys.exit("\n".join(failures))
@@ -0,0 +1,139 @@
+import re
+
+
+class StubResponse:
+    def __init__(self, data):
+        self.data = data
+
+
+class StubQuery:
+    """In-memory stand-in for a postgrest query builder.
+
+    Covers the subset of the builder interface the collector and dashboard
+    use: select/insert/upsert/update/delete, eq/gt/gte/in_/or_ filters,
+    order and limit. ``or_`` understands the keyset form produced by
+    ``supabase_client.iter_pages``.
+    """
+
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.action = "select"
+        self.columns = None
+        self.payload = None
+        self.on_conflict = None
+        self.filters = []
+        self.orders = []
+        self.row_limit = None
+
+    def select(self, *columns, **_):
+        self.action = "select"
+        names = [name.strip() for column in columns for name in column.split(",")]
+        self.columns = None if names == ["*"] else names
+        return self
+
+    def insert(self, json, **_):
+        self.action, self.payload = "insert", json
+        return self
+
+    def upsert(self, json, on_conflict="", **_):
+        self.action, self.payload, self.on_conflict = "upsert", json, on_conflict
+        return self
+
+    def update(self, json, **_):
+        self.action, self.payload = "update", json
+        return self
+
+    def delete(self, **_):
+        self.action = "delete"
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row.get(column) > value)
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row.get(column) >= value)
+        return self
+
+    def in_(self, column, values):
+        values = set(values)
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def or_(self, expression):
+        self.filters.append(_keyset_filter(expression))
+        return self
+
+    def order(self, column, desc=False, **_):
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, count, **_):
+        self.row_limit = count
+        return self
+
+    def execute(self):
+        self.client.calls.append((self.table, self.action))
+        rows = self.client.tables.setdefault(self.table, [])
+
+        if self.action in ("insert", "upsert"):
+            payload = self.payload if isinstance(self.payload, list) else [self.payload]
+            written = []
+            for item in payload:
+                item = dict(item)
+                if self.action == "upsert" and self.on_conflict:
+                    match = next((row for row in rows if row.get(self.on_conflict) == item.get(self.on_conflict)), None)
+                    if match is not None:
+                        match.update(item)
+                        written.append(dict(match))
+                        continue
+                rows.append(item)
+                written.append(dict(item))
+            return StubResponse(written)
+
+        selected = [row for row in rows if all(f(row) for f in self.filters)]
+        if self.action == "delete":
+            deleted = {id(row) for row in selected}
+            self.client.tables[self.table] = [row for row in rows if id(row) not in deleted]
+            return StubResponse(selected)
+        if self.action == "update":
+            for row in selected:
+                row.update(self.payload)
+            return StubResponse([dict(row) for row in selected])
+
+        for column, desc in reversed(self.orders):
+            selected.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+        if self.row_limit is not None:
+            selected = selected[:self.row_limit]
+        if self.columns:
+            return StubResponse([{c: row.get(c) for c in self.columns} for row in selected])
+        return StubResponse([dict(row) for row in selected])
+
+
+_KEYSET_RE = re.compile(r'(\w+)\.gt\.(.+?),and\((\w+)\.eq\.(.+?),(\w+)\.gt\.(.+)\)')
+
+def _keyset_filter(expression):
+    match = _KEYSET_RE.fullmatch(expression)
+    if not match:
+        raise ValueError(f"Unsupported or_ filter: {expression}")
+    col_a, val_a, col_b, val_b, col_c, val_c = (group.strip('"') for group in match.groups())
+    return lambda row: (
+        (row.get(col_a) is not None and row.get(col_a) > val_a)
+        or (row.get(col_b) == val_b and row.get(col_c) is not None and row.get(col_c) > val_c)
+    )
+
+
+class StubClient:
+    """Drop-in for ``supabase_client.supabase`` backed by in-memory tables."""
+
+    def __init__(self, tables=None):
+        self.tables = tables or {}
+        self.calls = []
+
+    def table(self, name):
+        return StubQuery(self, name)
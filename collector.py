@@ -1,131 +1,155 @@
+import time
 import requests
-from bs4 import BeautifulSoup
+from contextlib import ExitStack
 from uuid import uuid4
 from datetime import datetime
 from collections import defaultdict
-from dateutil.parser import parse
 
-from config import KEYWORDS
-from models import train_keyword_model
-from utils import summarize_text, extract_keywords
-from supabase_client import supabase
+from config import KEYWORDS, MATCH_WORD_BOUNDARIES
+from cooccurrence import load_or_rebuild
+from extract import parse_listing, parse_article
+from fetcher import Fetcher, DEFAULT_WORKERS, DEFAULT_PER_HOST, default_fetcher
+from frontier import SeenIndex
+from neardup import NearDuplicateIndex
+from search import SearchIndex
+from http_cache import ResponseCache
+from metrics import Metrics, PROFILERS, profiled
+from pipeline import Pipeline, DEFAULT_QUEUE_SIZE
+from loader import ArticleLoader, DEFAULT_BATCH_SIZE
+from utils import summarize_text, extract_keywords, chunked, published_date
+from supabase_client import supabase, iter_rows
+
+def find_keywords(text):
+    return extract_keywords(text, KEYWORDS, word_boundaries=MATCH_WORD_BOUNDARIES)
+
+def fetch_listing_page(url, fetcher):
+    print(f"Scraping {url}")
+    try:
+        with fetcher.metrics.timer("listing_fetch"):
+            resp = fetcher.get(url, timeout=15)
+        resp.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        print(f"⚠️ Error fetching page {url}: {e}")
+        return None
+    return resp.text
 
-# Train the keyword-based model
-vectorizer, model = train_keyword_model(KEYWORDS)
+def iter_listing_pages(pages=10, fetcher=None, seen=None, stop_when_seen=False):
+    """Yield the article cards of each of the first ``pages`` listing pages.
 
-def extract_keywords(text, keyword_list):
-    text_lower = text.lower()
-    return [kw.strip() for kw in keyword_list if kw.strip() in text_lower]
+    With ``stop_when_seen`` (and a ``seen`` index) paging stops after the
+    first listing page whose articles are all already known.
+    """
+    base_url = "https://techcrunch.com/page/"
+    fetcher = fetcher or default_fetcher()
 
-def flag_article(text):
-    found = extract_keywords(text, KEYWORDS)
-    return len(found) >= 1
+    urls = [f"{base_url}{page_num}/" for page_num in range(1, pages + 1)]
+    # Fetch in waves of `workers` pages: only one wave of HTML is held at a time,
+    # and an early stop wastes at most one wave
+    for wave in chunked(urls, fetcher.workers):
+        pages_html = fetcher.map(lambda url: fetch_listing_page(url, fetcher), wave)
 
-def scrape_articles(pages=10):
-    base_url = "https://techcrunch.com/page/"
-    articles = []
-
-    for page_num in range(1, pages + 1):
-        url = f"{base_url}{page_num}/"
-        print(f"Scraping {url}")
-        try:
-            resp = requests.get(url, timeout=15)
-            resp.raise_for_status()
-        except requests.exceptions.RequestException as e:
-            print(f"⚠️ Error fetching page {url}: {e}")
-            continue
-
-        soup = BeautifulSoup(resp.text, "html.parser")
-
-        for card in soup.find_all("div", class_="loop-card"):
-            title_tag = card.find("h3")
-            link_tag = title_tag.find("a") if title_tag else None
-            meta_tag = card.find("div", class_="loop-card__meta")
-
-            if not link_tag or not link_tag.get("href"):
+        for html in pages_html:
+            if html is None:
                 continue
 
-            title = link_tag.get_text(strip=True)
-            link = link_tag["href"]
-            date = meta_tag.get_text(strip=True) if meta_tag else "Unknown date"
+            page_articles = parse_listing(html)
+            yield page_articles
 
-            articles.append({
-                "title": title,
-                "url": link,
-                "date": date
-            })
+            if stop_when_seen and seen is not None and page_articles:
+                page_urls = {a["url"] for a in page_articles}
+                if seen.known(page_urls) == page_urls:
+                    print("⏹️ Listing page contains only known articles, stopping")
+                    return
 
-    return articles
-
-def scrape_article(url):
+def fetch_article_html(url, fetcher=None):
+    fetcher = fetcher or default_fetcher()
     try:
         print(f"Fetching article: {url}")
-        resp = requests.get(url, timeout=10)
+        with fetcher.metrics.timer("article_fetch"):
+            resp = fetcher.get(url, timeout=10)
         resp.raise_for_status()
     except requests.exceptions.TooManyRedirects:
         print(f"⚠️ Skipping {url} due to redirect loop")
-        return ""
+        return None
     except requests.exceptions.RequestException as e:
         print(f"⚠️ Error fetching {url}: {e}")
-        return ""
-
-    soup = BeautifulSoup(resp.text, "html.parser")
-    content_div = soup.find("div", class_="wp-block-post-content")
-    if not content_div:
-        return ""
-    paragraphs = content_div.find_all("p")
-    return ' '.join(p.get_text().strip() for p in paragraphs if p.get_text())
-
-def insert_raw_article(title, url, full_text, source="TechCrunch"):
-    existing = supabase.table("raw_articles").select("id", "full_text").eq("url", url).execute()
-    if existing.data:
-        raw_id = existing.data[0]["id"]
-        keywords_found = extract_keywords(existing.data[0]["full_text"], KEYWORDS)
-        return raw_id, keywords_found
-
-    keywords_found = extract_keywords(full_text, KEYWORDS)
-    raw_id = str(uuid4())
-    supabase.table("raw_articles").insert({
-        "id": raw_id,
-        "title": title,
-        "url": url,
-        "keywords": ', '.join(sorted(set(kw.strip() for kw in keywords_found))),
-        "full_text": full_text,
-        "source": source,
-        "created_at": datetime.utcnow().isoformat()
-    }).execute()
-    return raw_id, keywords_found
-
-def insert_clean_article(raw_id, summary, keywords_found, title, url):
-    if not keywords_found:
-        return  # Skip inserting if no keywords found
-
-    flagged = True
-    score = round(len(keywords_found) * 0.10, 2)
-    keywords = ', '.join(sorted(set(kw.strip() for kw in keywords_found)))
-
-    supabase.table("clean_articles").insert({
-        "id": str(uuid4()),
-        "raw_id": raw_id,
-        "summary": summary,
-        "keywords": keywords,
-        "flagged": flagged,
-        "score": score,
-        "title": title,
-        "url": url,
-        "created_at": datetime.utcnow().isoformat()
-    }).execute()
+        return None
+    return resp.text
+
+def scrape_article(url, fetcher=None):
+    html = fetch_article_html(url, fetcher)
+    return parse_article(html) if html else ""
+
+def analyze_html(html):
+    """Parse, match and summarize one article page; ``None`` if it has no body text.
+
+    Only the fields the loader needs come back, plus per-step timings, so
+    results stay small when this runs in a worker process.
+    """
+    start = time.perf_counter()
+    content = parse_article(html)
+    parsed = time.perf_counter()
+    if not content:
+        return None
+    keywords_found = find_keywords(content)
+    matched = time.perf_counter()
+    summary = summarize_text(content)
+    timings = {"parse": parsed - start, "keyword_match": matched - parsed, "summarize": time.perf_counter() - matched}
+    return {"full_text": content, "summary": summary, "keywords": keywords_found, "timings": timings}
+
+def analyze_chunk(pages_html):
+    # One round trip to a worker process per chunk of pages
+    return [analyze_html(html) for html in pages_html]
+
+def finish_record(article, record, metrics):
+    for step, seconds in record.pop("timings").items():
+        metrics.observe(step, seconds)
+    return {**article, **record}
+
+def process_article(article, html, metrics=None):
+    record = analyze_html(html)
+    return finish_record(article, record, metrics or Metrics()) if record else None
+
+DEDUPE_BATCH_SIZE = 200
+PROCESS_CHUNK_SIZE = 8
+
+def resolve_urls(articles):
+    # Older rows may predate the url column; look those up in bulk from raw_articles
+    missing = {a["raw_id"] for a in articles if not a.get("url") and a.get("raw_id")}
+    urls = {}
+    for raw_ids in chunked(missing, DEDUPE_BATCH_SIZE):
+        raw = supabase.table("raw_articles").select("id", "url").in_("id", raw_ids).execute()
+        urls.update((row["id"], row["url"]) for row in raw.data)
+    for article in articles:
+        if not article.get("url"):
+            article["url"] = urls.get(article.get("raw_id"))
+    return articles
 
-def deduplicate_clean_articles():
-    response = supabase.table("clean_articles").select("*").execute()
-    articles = response.data
+def deduplicate_clean_articles(since=None):
+    """Delete all but the newest clean_articles row per URL.
+
+    With ``since`` (an ISO timestamp) only URLs of rows created at or after
+    it are checked, which is enough to catch duplicates introduced by a run.
+    """
+    columns = ("id", "raw_id", "url", "created_at")
+    if since is None:
+        articles = list(iter_rows("clean_articles", columns, client=supabase))
+    else:
+        fresh = list(iter_rows("clean_articles", columns, filters=lambda q: q.gte("created_at", since), client=supabase))
+        fresh_urls = {a["url"] for a in resolve_urls(fresh) if a["url"]}
+        articles = []
+        for urls in chunked(fresh_urls, DEDUPE_BATCH_SIZE):
+            articles.extend(supabase.table("clean_articles").select(*columns).in_("url", urls).execute().data)
+        # Keep fresh rows whose url had to be resolved through raw_articles
+        known_ids = {a["id"] for a in articles}
+        articles.extend(a for a in fresh if a["id"] not in known_ids)
+
+    from dateutil.parser import parse
 
     grouped = defaultdict(list)
-    for article in articles:
-        raw = supabase.table("raw_articles").select("url").eq("id", article["raw_id"]).execute()
-        if raw.data:
-            url = raw.data[0]["url"]
-            grouped[url].append(article)
+    for article in resolve_urls(articles):
+        if article["url"]:
+            grouped[article["url"]].append(article)
 
     duplicates = []
     for url, group in grouped.items():
@@ -135,45 +159,208 @@ def deduplicate_clean_articles():
 
     for article in duplicates:
         print(f"🗑️ Removing duplicate: {article['raw_id']} (ID: {article['id']})")
-        supabase.table("clean_articles").delete().eq("id", article["id"]).execute()
+    for batch in chunked(duplicates, DEDUPE_BATCH_SIZE):
+        supabase.table("clean_articles").delete().in_("id", [a["id"] for a in batch]).execute()
 
     print(f"✅ Deleted {len(duplicates)} duplicate rows from clean_articles.")
 
-def main(pages=5):
-    articles = scrape_articles(pages=pages)
-    scraped_count = len(articles)
-    flagged_count = 0
-
-    print(f"Scraped {scraped_count} articles")
-
-    for article in articles:
-        content = scrape_article(article['url'])
-        if content:
-            raw_id, raw_keywords = insert_raw_article(article['title'], article['url'], content)
-            summary = summarize_text(content)
-            insert_clean_article(raw_id, summary, raw_keywords, article["title"], article["url"])
-            if raw_keywords:
-                flagged_count += 1
-                print(f"✅ Flagged: {article['title']}")
-                print(f"Summary: {summary}")
-                print("-" * 80)
-
-    # Save run stats into scrape_runs
+def report_flagged(article):
+    print(f"✅ Flagged: {article['title']}")
+    print(f"Summary: {article['summary']}")
+    print("-" * 80)
+
+def main(pages=5, workers=DEFAULT_WORKERS, per_host=DEFAULT_PER_HOST, batch_size=DEFAULT_BATCH_SIZE, use_seen_index=True, stop_when_seen=False, use_http_cache=True, offline=False, model_score=False, queue_size=DEFAULT_QUEUE_SIZE, processes=0, use_near_dup=True):
+    """Run one scrape. Returns the run's start timestamp.
+
+    ``offline`` replays listing and article pages from the HTTP cache only
+    and skips Supabase entirely, so parsing and keyword scoring can be re-run
+    without touching the network; flagged articles are just printed.
+    Stages stream through bounded queues of ``queue_size`` items, so memory
+    does not grow with ``pages``. With ``processes`` > 0, parsing, keyword
+    matching and summarizing run in that many worker processes, fed in
+    chunks of ``PROCESS_CHUNK_SIZE`` pages. ``use_near_dup`` keeps near-copies
+    of stored articles out of ``clean_articles`` (see ``neardup``).
+    """
+    run_started = datetime.utcnow()
+    started_at = run_started.isoformat()
+    metrics = Metrics()
+    counts = {"scraped": 0, "skipped": 0, "flagged": 0}
+
+    # Everything opened below is closed on the way out, even on an error or Ctrl+C;
+    # the loader is entered last, so its final flush runs while the indexes are still open
+    with ExitStack() as resources:
+        cache = ResponseCache() if use_http_cache or offline else None
+        if cache is not None:
+            resources.callback(cache.close)
+        seen = resources.enter_context(SeenIndex()) if use_seen_index and not offline else None
+        if seen is not None:
+            with metrics.timer("supabase.sync_seen"):
+                synced = seen.sync(client=supabase)
+            print(f"Seen-URL index: {len(seen)} known URLs ({synced} synced)")
+
+        def listed_articles():
+            for page in iter_listing_pages(pages=pages, fetcher=fetcher, seen=seen, stop_when_seen=stop_when_seen):
+                counts["scraped"] += len(page)
+                known = seen.known(a["url"] for a in page) if seen is not None else set()
+                counts["skipped"] += sum(a["url"] in known for a in page)
+                yield from (a for a in page if a["url"] not in known)
+
+        def fetch(article):
+            html = fetch_article_html(article["url"], fetcher)
+            return (article, html) if html else None
+
+        if offline:
+            loader = None
+
+            def load(record):
+                if record["keywords"]:
+                    counts["flagged"] += 1
+                    report_flagged(record)
+        else:
+            scorer = None
+            if model_score:
+                from models import get_scorer
+                scorer = get_scorer()
+
+            neardup = None
+            if use_near_dup:
+                neardup = resources.enter_context(NearDuplicateIndex())
+                with metrics.timer("supabase.sync_neardup"):
+                    synced = neardup.sync(client=supabase)
+                print(f"Near-duplicate index: {len(neardup)} articles ({synced} synced)")
+
+            search = resources.enter_context(SearchIndex())
+            with metrics.timer("supabase.cooccurrence"):
+                cooccurrence = load_or_rebuild(client=supabase)
+
+            def on_flush(urls):
+                # Save with every batch, like the seen index: once rows are stored they are never ingested again
+                cooccurrence.save()
+                if seen is not None:
+                    seen.add_many(urls)
+
+            loader = resources.enter_context(ArticleLoader(
+                batch_size=batch_size, on_flagged=report_flagged, scorer=scorer, cooccurrence=cooccurrence,
+                on_flush=on_flush, metrics=metrics, neardup=neardup, search=search,
+            ))
+
+            def load(record):
+                published_at = published_date(record["url"], record.get("date"), now=run_started)
+                loader.add(record["title"], record["url"], record["full_text"], record["summary"], record["keywords"], published_at=published_at)
+
+        pool = None
+        if processes > 0:
+            from concurrent.futures import ProcessPoolExecutor
+            from multiprocessing import get_context
+
+            # spawn, not fork: the pipeline's threads may hold locks when a worker starts
+            pool = resources.enter_context(ProcessPoolExecutor(max_workers=processes, mp_context=get_context("spawn")))
+
+        def process_chunk(items):
+            records = pool.submit(analyze_chunk, [html for _, html in items]).result()
+            return [finish_record(article, record, metrics) for (article, _), record in zip(items, records) if record]
+
+        # Listing -> fetch -> parse/match/summarize -> load, overlapping through bounded queues
+        with Fetcher(workers=workers, per_host=per_host, cache=cache, offline=offline, metrics=metrics) as fetcher:
+            pipeline = Pipeline(listed_articles(), maxsize=queue_size, name="listing")
+            pipeline.stage("fetch", fetch, workers=fetcher.workers)
+            if pool is None:
+                pipeline.stage("process", lambda item: process_article(*item, metrics=metrics))
+            else:
+                # One thread per worker process, each keeping a chunk in flight
+                pipeline.stage("process", process_chunk, workers=processes, batch_size=PROCESS_CHUNK_SIZE)
+            pipeline.stage("load", load)
+            stage_stats = pipeline.run()
+            for host, limit in fetcher.host_limits().items():
+                print(f"🚦 {host}: concurrency limit {limit} of {fetcher.per_host}")
+
+        if cache is not None and not offline:
+            cache.evict()
+
+    flagged_count = counts["flagged"] if offline else loader.flagged_count
+    scraped_count = counts["scraped"]
+
+    print(f"Scraped {scraped_count} articles, skipped {counts['skipped']} already stored")
+    if not offline and loader.near_copies:
+        print(f"🔁 {loader.near_copies} near-copies kept out of clean_articles")
+    for name, stats in stage_stats.items():
+        print(f"📈 {name}: {stats['processed']} items, {stats['busy_s']}s busy, queue avg {stats['queue_avg']} / max {stats['queue_max']}")
+    metrics.incr("articles_scraped", scraped_count)
+    metrics.incr("articles_flagged", flagged_count)
+    metrics.report()
+
+    if offline:
+        print(f"📊 Offline replay complete: Scraped {scraped_count}, Flagged {flagged_count}")
+        return started_at
+
+    # Save run stats into scrape_runs, with the timing summary for the dashboard
+    summary = metrics.summary()
+    summary["queues"] = stage_stats
     supabase.table("scrape_runs").insert({
         "id": str(uuid4()),
         "scraped_count": scraped_count,
         "flagged_count": flagged_count,
+        "duration_s": summary["duration_s"],
+        "metrics": summary,
         "created_at": datetime.utcnow().isoformat()
     }).execute()
 
     print(f"📊 Run complete: Scraped {scraped_count}, Flagged {flagged_count}")
+    return started_at
 
 if __name__ == "__main__":
     import argparse
 
     parser = argparse.ArgumentParser(description="Scrape TechCrunch articles and insert into Supabase")
+    parser.add_argument("command", nargs="?", choices=("scrape", "rescore", "dedupe"), default="scrape", help="scrape (default), rescore stored raw_articles against the current KEYWORDS, or dedupe every clean_articles row")
     parser.add_argument("--pages", type=int, default=5, help="Number of TechCrunch pages to scrape")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Concurrent HTTP fetches (1 = serial)")
+    parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST, help="Max concurrent requests to a single host")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Articles buffered per Supabase upsert")
+    parser.add_argument("--full-dedupe", action="store_true", help="Check every clean_articles row for duplicates, not just this run's")
+    parser.add_argument("--stop-when-seen", action="store_true", help="Stop paging once a listing page has only known articles")
+    parser.add_argument("--refetch-seen", action="store_true", help="Ignore the local seen-URL index and fetch every listed article")
+    parser.add_argument("--no-http-cache", action="store_true", help="Disable the on-disk HTTP response cache")
+    parser.add_argument("--offline", action="store_true", help="Replay pages from the HTTP cache only; no network or Supabase access")
+    parser.add_argument("--processes", type=int, default=0, help="Worker processes for parsing and keyword matching (0 = in-process)")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE, help="Max items waiting between pipeline stages")
+    parser.add_argument("--no-near-dup", action="store_true", help="Skip near-duplicate detection; every flagged article gets a clean row")
+    parser.add_argument("--model-score", action="store_true", help="Store a model probability (model_score) next to the keyword score")
+    parser.add_argument("--profile", choices=PROFILERS, help="Profile the command with cProfile or pyinstrument (written under .cache/profiles/)")
+    parser.add_argument("--restart", action="store_true", help="rescore: ignore the saved checkpoint and start from the oldest article")
     args = parser.parse_args()
 
-    main(pages=args.pages)
-    deduplicate_clean_articles()
\ No newline at end of file
+    with profiled(args.profile, name=args.command):
+        if args.command == "dedupe":
+            # No upserts: safe to run before the url unique constraints exist
+            deduplicate_clean_articles(since=None)
+        elif args.command == "rescore":
+            from rescore import Rescorer
+
+            scorer = None
+            if args.model_score:
+                from models import get_scorer
+                scorer = get_scorer()
+            neardup = None if args.no_near_dup else NearDuplicateIndex()
+            try:
+                Rescorer(processes=args.processes, scorer=scorer, neardup=neardup).run(restart=args.restart)
+            finally:
+                if neardup is not None:
+                    neardup.close()
+        else:
+            started_at = main(
+                pages=args.pages,
+                workers=args.workers,
+                per_host=args.per_host,
+                batch_size=args.batch_size,
+                use_seen_index=not args.refetch_seen,
+                stop_when_seen=args.stop_when_seen,
+                use_http_cache=not args.no_http_cache,
+                offline=args.offline,
+                model_score=args.model_score,
+                queue_size=args.queue_size,
+                processes=args.processes,
+                use_near_dup=not args.no_near_dup,
+            )
+            if not args.offline:
+                deduplicate_clean_articles(since=None if args.full_dedupe else started_at)
@@ -6,14 +6,36 @@ load_dotenv()
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
+# Local state (seen-URL index, caches) shared by the collector and dashboard
+CACHE_DIR = os.getenv("FRAUD_CACHE_DIR", ".cache")
+
+# Versioned model artifacts written by models.save_model
+MODEL_DIR = os.getenv("FRAUD_MODEL_DIR", os.path.join(CACHE_DIR, "models"))
+
+# HTML extraction backend used by the collector (see extract.BACKENDS)
+EXTRACT_BACKEND = os.getenv("EXTRACT_BACKEND", "soup")
+
+# When true, keywords only match as whole words ("scam" won't hit "scampi")
+MATCH_WORD_BOUNDARIES = os.getenv("MATCH_WORD_BOUNDARIES", "false").lower() in ("1", "true", "yes")
+
+# Matched case-insensitively, so they are written in lowercase
 KEYWORDS = [
     "fraud", "scam", "phishing", "cybercrime", "hacking", "data breach",
     "identity theft", "malware", "ransomware", "social engineering",
     "money laundering", "credit card fraud", "sms spam", "phishing page",
     "fake website", "stolen data", "cryptocurrency scam", "cyber attack",
-    "unauthorized access", "supply chain attack", "botnet", "AI scam",
+    "unauthorized access", "supply chain attack", "botnet", "ai scam",
     "encrypted messaging", "deep web", "dark web", "data leak", "identity mismatch",
-    "fake invoice", "data leak", "network vulnerability", "billing discrepancy",
+    "fake invoice", "network vulnerability", "billing discrepancy",
     "unexpected charge", "account irregularity", "credit alert", "suspicious login",
     "unusual activity", "security breach", "account takeover", "financial fraud"
-]
\ No newline at end of file
+]
+# Keyword substrings per dashboard threat category; the first matching category wins
+THREAT_CATEGORIES = {
+    "Data Breach": ["data breach", "data leak", "breach", "exposed", "stolen data"],
+    "Phishing": ["phishing", "phishing page", "fake website", "social engineering"],
+    "Malware": ["malware", "ransomware", "botnet", "trojan", "virus"],
+    "Fraud": ["fraud", "scam", "money laundering", "credit card fraud", "fake invoice"],
+    "Account Compromise": ["account takeover", "unauthorized access", "account irregularity"],
+}
+DEFAULT_THREAT_CATEGORY = "Other"
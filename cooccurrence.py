@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+from collections import defaultdict
+
+from config import CACHE_DIR, KEYWORDS
+
+COOCCURRENCE_PATH = os.path.join(CACHE_DIR, "keyword_cooccurrence.json")
+
+
+class CooccurrenceMatrix:
+    """Sparse, symmetric keyword x keyword article counts indexed by ``KEYWORDS``.
+
+    Only the upper triangle is stored; the diagonal holds how many articles
+    mention each keyword. Counts are updated incrementally as articles are
+    ingested, so the dashboard never has to rebuild them from raw rows.
+    """
+
+    def __init__(self, keywords=KEYWORDS):
+        self.keywords = list(dict.fromkeys(kw.strip().lower() for kw in keywords if kw.strip()))
+        self.index = {kw: i for i, kw in enumerate(self.keywords)}
+        self.counts = defaultdict(int)
+
+    def add(self, keywords_found, weight=1):
+        ids = sorted({self.index[kw] for kw in (k.strip().lower() for k in keywords_found) if kw in self.index})
+        for a, i in enumerate(ids):
+            for j in ids[a:]:
+                self.counts[(i, j)] += weight
+                if not self.counts[(i, j)]:
+                    del self.counts[(i, j)]
+
+    def remove(self, keywords_found):
+        self.add(keywords_found, weight=-1)
+
+    def fingerprint(self):
+        digest = hashlib.sha256(json.dumps(sorted(self.counts.items())).encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    def degrees(self):
+        # Distinct co-occurring keywords per keyword, like a graph node degree
+        degree = defaultdict(int)
+        for (i, j), count in self.counts.items():
+            if i != j and count > 0:
+                degree[self.keywords[i]] += 1
+                degree[self.keywords[j]] += 1
+        for (i, j), count in self.counts.items():
+            if i == j and count > 0:
+                degree.setdefault(self.keywords[i], 0)
+        return dict(degree)
+
+    def top_keywords(self, n=20):
+        return [kw for kw, _ in sorted(self.degrees().items(), key=lambda item: item[1], reverse=True)[:n]]
+
+    def edges(self, nodes):
+        """``(kw_a, kw_b, count)`` for every co-occurring pair within ``nodes``."""
+        ids = {self.index[kw] for kw in nodes if kw in self.index}
+        return [
+            (self.keywords[i], self.keywords[j], count)
+            for (i, j), count in sorted(self.counts.items())
+            if i != j and count > 0 and i in ids and j in ids
+        ]
+
+    def save(self, path=COOCCURRENCE_PATH):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"keywords": self.keywords, "entries": [[i, j, n] for (i, j), n in sorted(self.counts.items())]}, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=COOCCURRENCE_PATH, keywords=KEYWORDS):
+        matrix = cls(keywords)
+        if not os.path.exists(path):
+            return matrix
+        with open(path, encoding="utf-8") as f:
+            stored = json.load(f)
+        # Remap by name so edits to KEYWORDS keep counts for keywords that remain
+        for i, j, count in stored["entries"]:
+            a, b = matrix.index.get(stored["keywords"][i]), matrix.index.get(stored["keywords"][j])
+            if a is not None and b is not None:
+                matrix.counts[(min(a, b), max(a, b))] += count
+        return matrix
+
+    @classmethod
+    def from_keyword_strings(cls, keyword_strings, keywords=KEYWORDS):
+        """Build from comma-joined ``keywords`` values such as clean_articles rows."""
+        matrix = cls(keywords)
+        for value in keyword_strings:
+            if value:
+                matrix.add(value.split(","))
+        return matrix
+
+
+def rebuild(client=None, path=COOCCURRENCE_PATH):
+    """Recount from every clean_articles row (one row per URL) and save."""
+    from supabase_client import iter_rows
+
+    latest = {}
+    for row in iter_rows("clean_articles", ["url", "keywords"], client=client):
+        latest[row["url"]] = row["keywords"]
+    matrix = CooccurrenceMatrix.from_keyword_strings(latest.values())
+    matrix.save(path)
+    return matrix
+
+def load_or_rebuild(client=None, path=COOCCURRENCE_PATH):
+    """The saved matrix, or one rebuilt from clean_articles when none is saved yet.
+
+    Starting from an empty matrix instead would save counts for just the
+    articles loaded since, and the dashboard prefers the saved file.
+    """
+    if os.path.exists(path):
+        return CooccurrenceMatrix.load(path)
+    print(f"🕸️ No co-occurrence counts at {path}, rebuilding them from clean_articles")
+    return rebuild(client=client, path=path)
+
+
+if __name__ == "__main__":
+    matrix = rebuild()
+    print(f"✅ Rebuilt co-occurrence matrix: {len(matrix.counts)} non-zero cells, saved to {COOCCURRENCE_PATH}")
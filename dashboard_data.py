@@ -0,0 +1,214 @@
+import json
+import os
+import re
+
+import pandas as pd
+import streamlit as st
+
+from config import CACHE_DIR, KEYWORDS, THREAT_CATEGORIES, DEFAULT_THREAT_CATEGORY
+from cooccurrence import COOCCURRENCE_PATH, CooccurrenceMatrix
+from search import SearchIndex
+from supabase_client import supabase, iter_frames
+from utils import chunked
+
+CACHE_TTL_SECONDS = 300
+RAW_LOOKUP_BATCH_SIZE = 200
+
+# Only the columns the dashboard reads; full_text never leaves the database
+ARTICLE_COLUMNS = ("id", "raw_id", "summary", "keywords", "flagged", "score", "threat_category", "published_at", "cluster_id", "created_at")
+
+# Arrow IPC, memory-mapped on read; bump SNAPSHOT_VERSION when derived columns change
+SNAPSHOT_PATH = os.path.join(CACHE_DIR, "articles.arrow")
+SNAPSHOT_VERSION = 1
+
+RUN_COLUMNS = ("scraped_count", "flagged_count", "duration_s", "metrics", "created_at")
+
+UNKNOWN_RAW = {"title": "Unknown", "url": "#"}
+
+
+def categorize(keywords):
+    """Vectorized ``utils.threat_category`` over a Series of comma-joined keywords."""
+    lowered = keywords.fillna("").str.lower()
+    category = pd.Series(DEFAULT_THREAT_CATEGORY, index=keywords.index)
+    # Assign in reverse so the first matching category wins
+    for name, patterns in reversed(list(THREAT_CATEGORIES.items())):
+        category[lowered.str.contains("|".join(map(re.escape, patterns)))] = name
+    return category
+
+def url_dates(urls):
+    return pd.to_datetime(urls.str.extract(r"/(\d{4}/\d{2}/\d{2})/")[0], format="%Y/%m/%d", errors="coerce")
+
+def fetch_raw_lookup(raw_ids):
+    lookup = {}
+    for ids in chunked(raw_ids, RAW_LOOKUP_BATCH_SIZE):
+        response = supabase.table("raw_articles").select("id", "title", "url").in_("id", ids).execute()
+        lookup.update((row["id"], row) for row in response.data)
+    return lookup
+
+def derive_articles(df):
+    """Dashboard columns for freshly fetched clean_articles rows: title/url join, parsed dates, categories."""
+    raw = fetch_raw_lookup({rid for rid in df["raw_id"].dropna()})
+    df["title"] = df["raw_id"].map(lambda rid: raw.get(rid, UNKNOWN_RAW)["title"])
+    df["url"] = df["raw_id"].map(lambda rid: raw.get(rid, UNKNOWN_RAW)["url"])
+
+    # Normalize created_at early so all tabs/charts get datetime objects; always UTC so
+    # rows fetched in different loads share one dtype in the snapshot
+    df["created_at"] = pd.to_datetime(df["created_at"], errors="coerce", utc=True)
+    df["created_day"] = df["created_at"].dt.normalize().dt.tz_localize(None)
+    df = df[df["keywords"].fillna("").str.strip() != ""].copy()
+
+    # Rows stored before the collector computed these columns are filled in here
+    for column in ("threat_category", "published_at", "cluster_id"):
+        if column not in df:
+            df[column] = None
+    missing = df["threat_category"].isna()
+    df.loc[missing, "threat_category"] = categorize(df.loc[missing, "keywords"])
+    df["published_at"] = pd.to_datetime(df["published_at"], errors="coerce").fillna(url_dates(df["url"]))
+    df["keyword_count"] = df["keywords"].str.count(", ") + 1
+    return df
+
+def dedupe_articles(df):
+    # Newest row per URL, then per near-duplicate cluster
+    df = df.sort_values("created_at", ascending=False).drop_duplicates(subset="url")
+    return df[df["cluster_id"].isna() | ~df.duplicated(subset="cluster_id")].reset_index(drop=True)
+
+def merge_delta(snapshot, fresh):
+    """Append deduplicated delta rows to the snapshot table, dropping the snapshot rows they supersede.
+
+    Delta rows were created after every snapshot row, so newest-wins only
+    needs a membership test against the snapshot, not a re-sort of it.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    stale = pc.or_(
+        pc.is_in(snapshot["url"], value_set=fresh["url"], skip_nulls=True),
+        # Either side's cluster_id is a null column if none of its rows were clustered
+        pc.is_in(snapshot["cluster_id"].cast(pa.large_string()), value_set=fresh["cluster_id"].combine_chunks().cast(pa.large_string()), skip_nulls=True),
+    )
+    if pc.any(stale).as_py():
+        snapshot = snapshot.filter(pc.invert(stale))
+    return pa.concat_tables([snapshot, fresh.select(snapshot.column_names)], promote_options="permissive")
+
+def snapshot_key():
+    from models import keywords_fingerprint
+    return f"{SNAPSHOT_VERSION}:{keywords_fingerprint(KEYWORDS)}"
+
+def read_snapshot(path=SNAPSHOT_PATH):
+    """``(table, cursor)`` memory-mapped from the snapshot, or ``(None, None)`` if there is no usable one."""
+    import pyarrow as pa
+
+    if not os.path.exists(path):
+        return None, None
+    table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+    metadata = table.schema.metadata or {}
+    if metadata.get(b"key", b"").decode() != snapshot_key():
+        # Built by an older dashboard or before a KEYWORDS change (and rescore): start over
+        return None, None
+    return table, tuple(json.loads(metadata[b"cursor"]))
+
+def write_snapshot(table, cursor, path=SNAPSHOT_PATH):
+    import pyarrow as pa
+
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), b"key": snapshot_key(), b"cursor": json.dumps(list(cursor))})
+    tmp_path = f"{path}.tmp"
+    with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp_path, path)
+
+@st.cache_resource(ttl=CACHE_TTL_SECONDS, show_spinner="Loading articles...")
+def load_articles():
+    """Derived article table: the local snapshot plus clean_articles rows created after its cursor.
+
+    Only the delta is fetched and derived. When there is one, the snapshot
+    file is rewritten with it merged in and mapped again. Columns are
+    ``pd.ArrowDtype`` views over the memory-mapped file, so the history is
+    not copied onto the heap. One table is shared by every session; treat
+    it as read-only.
+    """
+    import pyarrow as pa
+
+    table, cursor = read_snapshot()
+    frames = list(iter_frames("clean_articles", ARTICLE_COLUMNS, after=cursor, client=supabase))
+    if frames:
+        cursor = (frames[-1]["created_at"].iloc[-1], frames[-1]["id"].iloc[-1])
+        fresh = pa.Table.from_pandas(dedupe_articles(derive_articles(pd.concat(frames, ignore_index=True))), preserve_index=False)
+        write_snapshot(fresh if table is None else merge_delta(table, fresh), cursor)
+        table, cursor = read_snapshot()
+    return table.to_pandas(types_mapper=pd.ArrowDtype) if table is not None else pd.DataFrame()
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def load_latest_run():
+    response = supabase.table("scrape_runs").select("*").order("created_at", desc=True).limit(1).execute()
+    return response.data[0] if response.data else None
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def load_runs():
+    """One row per scrape run with its duration and per-stage timer totals (seconds)."""
+    frames = list(iter_frames("scrape_runs", RUN_COLUMNS, client=supabase))
+    if not frames:
+        return pd.DataFrame()
+    runs = pd.concat(frames, ignore_index=True)
+    runs["created_at"] = pd.to_datetime(runs["created_at"], errors="coerce")
+    # Runs recorded before instrumentation have no duration or metrics
+    for column in ("duration_s", "metrics"):
+        if column not in runs:
+            runs[column] = None
+    runs = runs[runs["duration_s"].notna()]
+    stages = pd.DataFrame(
+        [{name: t["total_s"] for name, t in (m or {}).get("timers", {}).items()} for m in runs["metrics"]],
+        index=runs.index,
+    )
+    return runs.drop(columns="metrics").join(stages)
+
+@st.cache_resource(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def load_cooccurrence(_keyword_strings=None):
+    """The collector's ingest-time matrix, or one counted from ``_keyword_strings`` if none is saved yet."""
+    if os.path.exists(COOCCURRENCE_PATH) or _keyword_strings is None:
+        return CooccurrenceMatrix.load()
+    return CooccurrenceMatrix.from_keyword_strings(_keyword_strings)
+
+@st.cache_data(show_spinner=False)
+def network_layout(fingerprint, _nodes, _edges):
+    """spring_layout positions, computed once per matrix fingerprint and node set."""
+    import networkx as nx
+
+    graph = nx.Graph()
+    graph.add_nodes_from(_nodes)
+    graph.add_weighted_edges_from(_edges)
+    pos = nx.spring_layout(graph, k=0.5, iterations=50, seed=42)
+    return {node: (float(x), float(y)) for node, (x, y) in pos.items()}
+
+@st.cache_resource(show_spinner=False)
+def load_search_index():
+    return SearchIndex()
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner="Indexing new articles...")
+def sync_search_index():
+    """Pull raw_articles rows added since the last sync into the local search index."""
+    return load_search_index().sync(client=supabase)
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def search_articles(query):
+    """Ranked matches for ``query`` (url, rank), best first."""
+    sync_search_index()
+    hits = load_search_index().search(query)
+    return pd.DataFrame(hits, columns=["url", "title", "rank"]).drop(columns="title")
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def search_snippets(query, urls):
+    return load_search_index().snippets(query, urls)
+
+def invalidate(rebuild=False):
+    """Drop cached data; ``rebuild`` also deletes the article snapshot so the next load refetches everything."""
+    if rebuild and os.path.exists(SNAPSHOT_PATH):
+        os.remove(SNAPSHOT_PATH)
+    load_articles.clear()
+    load_latest_run.clear()
+    load_runs.clear()
+    load_cooccurrence.clear()
+    sync_search_index.clear()
+    search_articles.clear()
+    search_snippets.clear()
@@ -0,0 +1,119 @@
+from bs4 import BeautifulSoup, SoupStrainer
+
+from config import EXTRACT_BACKEND
+
+LISTING_CARD_CLASS = "loop-card"
+LISTING_META_CLASS = "loop-card__meta"
+ARTICLE_BODY_CLASS = "wp-block-post-content"
+
+
+def _listing_entry(title, link, date):
+    return {
+        "title": title,
+        "url": link,
+        "date": date
+    }
+
+
+# --- reference: full html.parser tree, exactly as the collector always did ---
+
+def _parse_listing_reference(html, parse_only=None):
+    articles = []
+    soup = BeautifulSoup(html, "html.parser", parse_only=parse_only)
+
+    for card in soup.find_all("div", class_=LISTING_CARD_CLASS):
+        title_tag = card.find("h3")
+        link_tag = title_tag.find("a") if title_tag else None
+        meta_tag = card.find("div", class_=LISTING_META_CLASS)
+
+        if not link_tag or not link_tag.get("href"):
+            continue
+
+        title = link_tag.get_text(strip=True)
+        link = link_tag["href"]
+        date = meta_tag.get_text(strip=True) if meta_tag else "Unknown date"
+
+        articles.append(_listing_entry(title, link, date))
+
+    return articles
+
+def _parse_article_reference(html, parse_only=None):
+    soup = BeautifulSoup(html, "html.parser", parse_only=parse_only)
+    content_div = soup.find("div", class_=ARTICLE_BODY_CLASS)
+    if not content_div:
+        return ""
+    paragraphs = content_div.find_all("p")
+    return ' '.join(p.get_text().strip() for p in paragraphs if p.get_text())
+
+
+# --- soup: same tree walk, but html.parser only builds the elements we read ---
+
+def _has_class(cls):
+    # SoupStrainer sees the raw attribute string, not bs4's split class list
+    def match(value):
+        if value is None:
+            return False
+        return cls in (value.split() if isinstance(value, str) else value)
+    return match
+
+_LISTING_STRAINER = SoupStrainer("div", class_=_has_class(LISTING_CARD_CLASS))
+_ARTICLE_STRAINER = SoupStrainer("div", class_=_has_class(ARTICLE_BODY_CLASS))
+
+def _parse_listing_soup(html):
+    return _parse_listing_reference(html, parse_only=_LISTING_STRAINER)
+
+def _parse_article_soup(html):
+    return _parse_article_reference(html, parse_only=_ARTICLE_STRAINER)
+
+
+BACKENDS = {
+    "reference": (_parse_listing_reference, _parse_article_reference),
+    "soup": (_parse_listing_soup, _parse_article_soup),
+}
+
+DEFAULT_BACKEND = EXTRACT_BACKEND
+
+
+def parse_listing(html, backend=DEFAULT_BACKEND):
+    """Article cards (title, url, date) from a TechCrunch listing page."""
+    return BACKENDS[backend][0](html)
+
+def parse_article(html, backend=DEFAULT_BACKEND):
+    """Space-joined paragraph text of an article body, or "" if there is none."""
+    return BACKENDS[backend][1](html)
+
+
+def fixture_as_article(html):
+    # Listing fixtures have no article body, so wrap each page's <body> markup in
+    # one; that runs real-world nesting and entities through parse_article.
+    start = html.index(">", html.index("<body")) + 1
+    end = html.rindex("</body>")
+    return f'<html><body><div class="{ARTICLE_BODY_CLASS}">{html[start:end]}</div></body></html>'
+
+def check_fixtures(paths):
+    """Compare every backend against the reference; returns a list of mismatch messages."""
+    mismatches = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+        expected_listing = parse_listing(html, backend="reference")
+        expected_article = parse_article(fixture_as_article(html), backend="reference")
+        for name in BACKENDS:
+            if parse_listing(html, backend=name) != expected_listing:
+                mismatches.append(f"{path}: {name} listing differs from reference")
+            if parse_article(fixture_as_article(html), backend=name) != expected_article:
+                mismatches.append(f"{path}: {name} article text differs from reference")
+    return mismatches
+
+
+if __name__ == "__main__":
+    import glob
+    import sys
+
+    paths = sorted(glob.glob("techcrunch_page_*.html"))
+    problems = check_fixtures(paths)
+    for problem in problems:
+        print(f"❌ {problem}")
+    if problems:
+        sys.exit(1)
+    print(f"✅ {', '.join(BACKENDS)} backends agree on {len(paths)} fixtures")
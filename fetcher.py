@@ -0,0 +1,253 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import Metrics
+
+DEFAULT_WORKERS = 8
+DEFAULT_PER_HOST = 4
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+RETRY_AFTER_MAX = 120.0
+CONNECT_TIMEOUT = 5
+SLOW_RESPONSE_SECONDS = 5.0
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 30.0
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+
+def make_session(pool_size=DEFAULT_WORKERS):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_MAX):
+    # "Full jitter": uniform over [0, base * 2^attempt], so retries from many threads spread out
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+def retry_after_seconds(resp, cap=RETRY_AFTER_MAX):
+    """Seconds asked for by a ``Retry-After`` header (delta or HTTP date), capped; 0 if absent."""
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return 0.0
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return 0.0
+    return min(cap, max(0.0, seconds))
+
+
+class HostLimiter:
+    """Adaptive concurrency limit and circuit breaker for one host.
+
+    The limit follows AIMD: each fast, successful response raises it by
+    ``1/limit`` (about +1 per round of requests) up to ``max_limit``; an
+    error or a response slower than ``slow_after`` halves it, at most once
+    per round. After ``threshold`` consecutive failures the circuit opens
+    and requests fail fast with ``CircuitOpenError`` for ``cooldown``
+    seconds, then a single trial request decides whether it closes again.
+    """
+
+    def __init__(self, host, max_limit, slow_after=SLOW_RESPONSE_SECONDS, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.host = host
+        self.max_limit = max(1, max_limit)
+        self.limit = float(self.max_limit)
+        self.slow_after = slow_after
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def _check_circuit(self):
+        if self.opened_at is None:
+            return
+        if self._trial or time.monotonic() - self.opened_at < self.cooldown:
+            raise CircuitOpenError(f"circuit open for {self.host} after {self.failures} consecutive failures")
+
+    def acquire(self):
+        with self._cond:
+            while True:
+                self._check_circuit()
+                if self.in_flight < int(self.limit):
+                    break
+                self._cond.wait()
+            if self.opened_at is not None:
+                self._trial = True  # cooldown over: this request is the half-open probe
+            self.in_flight += 1
+            return time.monotonic()
+
+    def release(self, started, ok, count_failure=True):
+        with self._cond:
+            self.in_flight -= 1
+            latency = time.monotonic() - started
+            if ok:
+                self.failures = 0
+                self.opened_at = None
+                self._trial = False
+                if latency > self.slow_after:
+                    self._decrease(started)
+                else:
+                    self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            else:
+                self._decrease(started)
+                if count_failure:
+                    self.failures += 1
+                    if self._trial or self.failures >= self.threshold:
+                        self.opened_at = time.monotonic()
+                if self._trial:
+                    self._trial = False
+            self._cond.notify_all()
+
+    def _decrease(self, started):
+        # Responses to requests sent before the last cut describe the old limit; don't cut twice for them
+        if started >= self._last_decrease:
+            self.limit = max(1.0, self.limit / 2)
+            self._last_decrease = time.monotonic()
+
+
+class Fetcher:
+    """Shared keep-alive session plus a thread pool capped per host.
+
+    With a ``cache`` (an ``http_cache.ResponseCache``) requests carry
+    ``If-None-Match``/``If-Modified-Since`` and a 304 is answered from the
+    stored body. ``offline=True`` never touches the network and raises
+    ``requests.ConnectionError`` for anything not cached. Requests, bytes
+    downloaded, retries and cache revalidations are counted in ``metrics``.
+
+    Connection errors, timeouts, 429s and 5xx responses are retried up to
+    ``max_retries`` times with jittered exponential backoff, waiting at
+    least as long as any ``Retry-After`` header asks. Concurrency per host
+    adapts between 1 and ``per_host`` (see ``HostLimiter``).
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, per_host=DEFAULT_PER_HOST, session=None, cache=None, offline=False, metrics=None, max_retries=MAX_RETRIES, backoff_base=BACKOFF_BASE):
+        self.workers = max(1, workers)
+        self.per_host = max(1, per_host)
+        self.session = session or make_session(pool_size=self.workers)
+        self.cache = cache
+        self.offline = offline
+        self.metrics = metrics or Metrics()
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def limiter(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            limiter = self._hosts.get(host)
+            if limiter is None:
+                limiter = self._hosts[host] = HostLimiter(host, self.per_host)
+            return limiter
+
+    def host_limits(self):
+        with self._lock:
+            return {host: round(limiter.limit, 2) for host, limiter in self._hosts.items()}
+
+    def _send(self, url, timeout, headers):
+        limiter = self.limiter(url)
+        for attempt in range(self.max_retries + 1):
+            try:
+                started = limiter.acquire()
+            except CircuitOpenError:
+                self.metrics.incr("circuit_open_rejections")
+                raise
+            try:
+                resp = self.session.get(url, timeout=(CONNECT_TIMEOUT, timeout), headers=headers)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                limiter.release(started, ok=False)
+                if attempt == self.max_retries:
+                    raise
+                delay = backoff_delay(attempt, self.backoff_base)
+            except BaseException:
+                # Redirect loops, bad URLs, broken bodies, Ctrl+C: not retried and not a sign the host
+                # is down, but the slot (and a half-open probe) must still be given back
+                limiter.release(started, ok=False, count_failure=False)
+                raise
+            else:
+                self.metrics.incr("http_requests")
+                self.metrics.incr("bytes_downloaded", len(resp.content or b""))
+                if resp.status_code not in RETRY_STATUSES:
+                    limiter.release(started, ok=True)
+                    return resp
+                # 429 means slow down, not that the host is unhealthy: back off without tripping the breaker
+                throttled = resp.status_code == 429
+                self.metrics.incr("http_throttled" if throttled else "http_server_errors")
+                limiter.release(started, ok=False, count_failure=not throttled)
+                if attempt == self.max_retries:
+                    return resp
+                delay = max(backoff_delay(attempt, self.backoff_base), retry_after_seconds(resp))
+            self.metrics.incr("retries")
+            time.sleep(delay)
+
+    def get(self, url, timeout=10):
+        cached = self.cache.get(url) if self.cache is not None else None
+        if self.offline:
+            if cached is None:
+                raise requests.exceptions.ConnectionError(f"offline mode: {url} is not cached")
+            self.metrics.incr("http_cache_replays")
+            return cached
+
+        headers = self.cache.conditional_headers(cached) if self.cache is not None else None
+        resp = self._send(url, timeout, headers or None)
+
+        if self.cache is not None:
+            if resp.status_code == 304 and cached is not None:
+                self.metrics.incr("http_not_modified")
+                self.cache.touch(url)
+                return cached
+            if resp.status_code == 200:
+                self.cache.put(url, resp.text, resp.headers)
+        return resp
+
+    def map(self, fn, items):
+        # Results come back in input order so callers see the same sequence as a serial loop
+        items = list(items)
+        if self.workers == 1 or len(items) <= 1:
+            return [fn(item) for item in items]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            return list(pool.map(fn, items))
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_default_fetcher = None
+_default_fetcher_lock = threading.Lock()
+
+
+def default_fetcher():
+    """Shared serial ``Fetcher`` for callers that don't pass one, so repeated calls reuse one session."""
+    global _default_fetcher
+    with _default_fetcher_lock:
+        if _default_fetcher is None:
+            _default_fetcher = Fetcher(workers=1)
+        return _default_fetcher
@@ -0,0 +1,47 @@
+import os
+
+from config import CACHE_DIR
+from supabase_client import SyncedIndex
+from utils import chunked
+
+SEEN_INDEX_PATH = os.path.join(CACHE_DIR, "seen_urls.sqlite3")
+LOOKUP_BATCH_SIZE = 500
+
+
+class SeenIndex(SyncedIndex):
+    """Local SQLite set of article URLs already stored in ``raw_articles``.
+
+    ``sync`` pulls only rows newer than the last synced ``(created_at, id)``
+    cursor, so keeping the index current costs one small query per run.
+    Safe to share between threads.
+    """
+
+    def __init__(self, path=SEEN_INDEX_PATH):
+        super().__init__(path)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS seen_urls (url TEXT PRIMARY KEY)")
+        self.conn.commit()
+
+    def __contains__(self, url):
+        with self._lock:
+            return self.conn.execute("SELECT 1 FROM seen_urls WHERE url = ?", (url,)).fetchone() is not None
+
+    def __len__(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM seen_urls").fetchone()[0]
+
+    def known(self, urls):
+        found = set()
+        with self._lock:
+            for batch in chunked(set(urls), LOOKUP_BATCH_SIZE):
+                placeholders = ",".join("?" * len(batch))
+                rows = self.conn.execute(f"SELECT url FROM seen_urls WHERE url IN ({placeholders})", batch)
+                found.update(url for url, in rows)
+        return found
+
+    def add_many(self, urls):
+        with self._lock:
+            self.conn.executemany("INSERT OR IGNORE INTO seen_urls (url) VALUES (?)", ((url,) for url in urls))
+            self.conn.commit()
+
+    def index_page(self, page, client):
+        self.add_many(r["url"] for r in page if r.get("url"))
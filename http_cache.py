@@ -0,0 +1,103 @@
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from config import CACHE_DIR
+
+HTTP_CACHE_PATH = os.path.join(CACHE_DIR, "http_cache.sqlite3")
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+DEFAULT_MAX_AGE_SECONDS = 14 * 24 * 3600
+
+
+class CachedResponse:
+    """Stand-in for ``requests.Response`` when a body is served from the cache."""
+
+    from_cache = True
+    status_code = 200
+
+    def __init__(self, url, text, headers=None):
+        self.url = url
+        self.text = text
+        self.headers = headers or {}
+
+    @property
+    def content(self):
+        return self.text.encode("utf-8")
+
+    def raise_for_status(self):
+        pass
+
+
+class ResponseCache:
+    """On-disk HTTP body cache keyed by URL, with validators for conditional GETs.
+
+    Bodies are stored zlib-compressed alongside their ``ETag`` and
+    ``Last-Modified`` headers. ``evict`` drops entries older than ``max_age``
+    and then the least recently validated ones until the cache fits in
+    ``max_bytes``.
+    """
+
+    def __init__(self, path=HTTP_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES, max_age=DEFAULT_MAX_AGE_SECONDS):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "url TEXT PRIMARY KEY, body BLOB, etag TEXT, last_modified TEXT, fetched_at REAL, size INTEGER)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_fetched_at ON responses (fetched_at)")
+        self.conn.commit()
+
+    def get(self, url):
+        with self._lock:
+            row = self.conn.execute("SELECT body, etag, last_modified FROM responses WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        body, etag, last_modified = row
+        headers = {k: v for k, v in (("ETag", etag), ("Last-Modified", last_modified)) if v}
+        return CachedResponse(url, zlib.decompress(body).decode("utf-8"), headers)
+
+    def conditional_headers(self, cached):
+        headers = {}
+        if cached is not None:
+            if cached.headers.get("ETag"):
+                headers["If-None-Match"] = cached.headers["ETag"]
+            if cached.headers.get("Last-Modified"):
+                headers["If-Modified-Since"] = cached.headers["Last-Modified"]
+        return headers
+
+    def put(self, url, text, headers):
+        body = zlib.compress(text.encode("utf-8"))
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (url, body, etag, last_modified, fetched_at, size) VALUES (?, ?, ?, ?, ?, ?)",
+                (url, body, headers.get("ETag"), headers.get("Last-Modified"), time.time(), len(body)),
+            )
+            self.conn.commit()
+
+    def touch(self, url):
+        with self._lock:
+            self.conn.execute("UPDATE responses SET fetched_at = ? WHERE url = ?", (time.time(), url))
+            self.conn.commit()
+
+    def evict(self):
+        with self._lock:
+            removed = self.conn.execute("DELETE FROM responses WHERE fetched_at < ?", (time.time() - self.max_age,)).rowcount
+            total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.max_bytes:
+                for url, size in self.conn.execute("SELECT url, size FROM responses ORDER BY fetched_at").fetchall():
+                    self.conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+                    removed += 1
+                    total -= size
+                    if total <= self.max_bytes:
+                        break
+            self.conn.commit()
+        return removed
+
+    def close(self):
+        self.conn.close()
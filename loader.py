@@ -0,0 +1,212 @@
+from uuid import uuid4, uuid5, NAMESPACE_URL
+from datetime import datetime
+
+from config import KEYWORDS, MATCH_WORD_BOUNDARIES
+from metrics import Metrics
+from utils import extract_keywords, published_date, threat_category
+
+DEFAULT_BATCH_SIZE = 100
+
+
+def join_keywords(keywords_found):
+    return ', '.join(sorted(set(kw.strip() for kw in keywords_found)))
+
+def keyword_score(keywords_found):
+    return round(len(keywords_found) * 0.10, 2)
+
+def build_raw_row(title, url, full_text, keywords_found, source="TechCrunch", raw_id=None):
+    return {
+        "id": raw_id or str(uuid4()),
+        "title": title,
+        "url": url,
+        "keywords": join_keywords(keywords_found),
+        "full_text": full_text,
+        "source": source,
+        "created_at": datetime.utcnow().isoformat()
+    }
+
+def build_clean_row(raw_id, summary, keywords_found, title, url, clean_id=None, published_at=None):
+    return {
+        "id": clean_id or str(uuid4()),
+        "raw_id": raw_id,
+        "summary": summary,
+        "keywords": join_keywords(keywords_found),
+        "flagged": True,
+        "score": keyword_score(keywords_found),
+        "threat_category": threat_category(keywords_found),
+        "published_at": published_at or published_date(url),
+        "title": title,
+        "url": url,
+        "created_at": datetime.utcnow().isoformat()
+    }
+
+def clusters_with_clean_rows(client, clusters):
+    """``{cluster_id: urls}`` of the clean_articles rows already shown for each cluster.
+
+    ``clusters`` maps cluster ids to their canonical URL; canonical rows
+    written before near-duplicate detection have no ``cluster_id`` yet.
+    """
+    urls_by_cluster = {}
+    rows = client.table("clean_articles").select("url", "cluster_id").in_("cluster_id", list(clusters)).execute().data
+    for row in rows:
+        urls_by_cluster.setdefault(row["cluster_id"], set()).add(row["url"])
+    canonical = {url: cluster_id for cluster_id, url in clusters.items()}
+    rows = client.table("clean_articles").select("url").in_("url", list(canonical)).execute().data
+    for row in rows:
+        urls_by_cluster.setdefault(canonical[row["url"]], set()).add(row["url"])
+    return urls_by_cluster
+
+
+class ArticleLoader:
+    """Buffers scraped articles and writes them to Supabase in batches.
+
+    Each flush costs one ``in_("url", ...)`` lookup against ``raw_articles``
+    plus at most one upsert per table, with ``url`` as the conflict key.
+    Use it as a context manager so the last partial batch is flushed on exit.
+    ``client`` defaults to ``supabase_client.supabase``; pass any object with
+    the same ``table(...)`` query-builder interface to load somewhere else.
+    With a ``scorer`` (``models.KeywordScorer``) each batch of flagged rows is
+    scored in one call and stored as ``model_score`` next to ``score``. A
+    ``cooccurrence`` matrix is updated with the keywords of each new article
+    and ``on_flush`` is called with the batch's URLs once they are written.
+    With a ``neardup`` index (``neardup.NearDuplicateIndex``) each article's
+    text is assigned to a near-duplicate cluster: clean rows carry its
+    ``cluster_id``, and a near-copy whose cluster already has a clean row is
+    kept in ``raw_articles`` only, so a story is not scored or flagged twice.
+    Near-copies of unflagged articles still get a clean row. New
+    articles are also added to a ``search`` index (``search.SearchIndex``).
+    Every Supabase call is timed in ``metrics``.
+    """
+
+    def __init__(self, client=None, batch_size=DEFAULT_BATCH_SIZE, source="TechCrunch", on_flagged=None, scorer=None, cooccurrence=None, on_flush=None, metrics=None, neardup=None, search=None):
+        if client is None:
+            from supabase_client import supabase as client
+        self.client = client
+        self.scorer = scorer
+        self.cooccurrence = cooccurrence
+        self.neardup = neardup
+        self.search = search
+        self.batch_size = max(1, batch_size)
+        self.source = source
+        self.on_flagged = on_flagged
+        self.on_flush = on_flush
+        self.metrics = metrics or Metrics()
+        self.flagged_count = 0
+        self.near_copies = 0
+        self.rows_written = {"raw_articles": 0, "clean_articles": 0}
+        self._pending = {}
+
+    def add(self, title, url, full_text, summary, keywords_found, published_at=None):
+        # Keyed by URL: a URL seen twice before a flush is written once
+        self._pending[url] = {
+            "title": title,
+            "url": url,
+            "full_text": full_text,
+            "summary": summary,
+            "keywords_found": keywords_found,
+            "published_at": published_at,
+        }
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        batch = list(self._pending.values())
+        self._pending = {}
+
+        with self.metrics.timer("supabase.raw_articles.select"):
+            existing = self.client.table("raw_articles").select("id", "url", "full_text").in_("url", [a["url"] for a in batch]).execute()
+        existing_by_url = {row["url"]: row for row in existing.data}
+
+        raw_rows, clean_rows, clean_texts, flagged, new_keywords = [], [], [], [], []
+        summaries = {}
+        records = []
+        for article in batch:
+            known = existing_by_url.get(article["url"])
+            full_text = article["full_text"]
+            if known:
+                # Keep the stored row and rescan its text
+                raw_id = known["id"]
+                full_text = known["full_text"] or ""
+                keywords_found = extract_keywords(full_text, KEYWORDS, word_boundaries=MATCH_WORD_BOUNDARIES)
+            else:
+                keywords_found = article["keywords_found"]
+                row = build_raw_row(article["title"], article["url"], article["full_text"], keywords_found, source=self.source)
+                raw_id = row["id"]
+                raw_rows.append(row)
+                summaries[article["url"]] = article["summary"]
+
+            cluster_id = canonical_url = None
+            if self.neardup is not None:
+                with self.metrics.timer("neardup"):
+                    cluster_id, canonical_url = self.neardup.assign(article["url"], full_text)
+            records.append((article, known, raw_id, full_text, keywords_found, cluster_id, canonical_url))
+
+        # A near-copy is only left out when its cluster already has a clean row to show;
+        # an update that turns an unflagged story into a fraud story still gets its own
+        clustered = {cluster_id: canonical_url for article, _, _, _, keywords_found, cluster_id, canonical_url in records
+                     if keywords_found and canonical_url not in (None, article["url"])}
+        if clustered:
+            with self.metrics.timer("supabase.clean_articles.select"):
+                displayed = clusters_with_clean_rows(self.client, clustered)
+        else:
+            displayed = {}
+
+        for article, known, raw_id, full_text, keywords_found, cluster_id, canonical_url in records:
+            if not keywords_found:
+                continue
+            if cluster_id and displayed.get(cluster_id, set()) - {article["url"]}:
+                print(f"🔁 Near-copy of {canonical_url}: {article['title']}")
+                self.near_copies += 1
+                self.metrics.incr("near_copies")
+                continue
+            if cluster_id:
+                displayed.setdefault(cluster_id, set()).add(article["url"])
+            if not known:
+                new_keywords.append(keywords_found)
+
+            # Id derived from the URL so repeat upserts of an article keep the same primary key
+            clean_id = str(uuid5(NAMESPACE_URL, article["url"]))
+            clean_rows.append(build_clean_row(
+                raw_id, article["summary"], keywords_found, article["title"], article["url"],
+                clean_id=clean_id, published_at=article["published_at"],
+            ))
+            if cluster_id:
+                clean_rows[-1]["cluster_id"] = cluster_id
+            clean_texts.append(full_text)
+            flagged.append(article)
+
+        if self.scorer is not None:
+            with self.metrics.timer("model_score"):
+                for row, model_score in zip(clean_rows, self.scorer.score(clean_texts)):
+                    row["model_score"] = model_score
+
+        for table, rows in (("raw_articles", raw_rows), ("clean_articles", clean_rows)):
+            if rows:
+                with self.metrics.timer(f"supabase.{table}.upsert"):
+                    self.client.table(table).upsert(rows, on_conflict="url").execute()
+                self.rows_written[table] += len(rows)
+                self.metrics.incr(f"rows_written.{table}", len(rows))
+
+        # Counted only once the rows are stored, so a failed upsert can't count an article twice
+        if self.cooccurrence is not None:
+            for keywords_found in new_keywords:
+                self.cooccurrence.add(keywords_found)
+
+        if self.search is not None and raw_rows:
+            with self.metrics.timer("search_index"):
+                self.search.add_many({**row, "summary": summaries[row["url"]]} for row in raw_rows)
+
+        self.flagged_count += len(flagged)
+        if self.on_flagged:
+            for article in flagged:
+                self.on_flagged(article)
+        if self.on_flush:
+            self.on_flush([article["url"] for article in batch])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
@@ -0,0 +1,96 @@
+from collections import Counter, deque
+from functools import lru_cache
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton that finds every keyword in one pass over the text.
+
+    Matching is case-insensitive. Keywords that differ only by case or
+    surrounding whitespace are collapsed to their first spelling. With
+    ``word_boundaries=True`` a match must not touch a letter or digit on
+    either side, so "scam" no longer matches inside "scampi".
+    """
+
+    def __init__(self, keywords, word_boundaries=False):
+        self.word_boundaries = word_boundaries
+        self.keywords = []
+        seen = set()
+        for kw in keywords:
+            key = kw.strip().lower()
+            if key and key not in seen:
+                seen.add(key)
+                self.keywords.append(kw.strip())
+
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for idx, kw in enumerate(self.keywords):
+            state = 0
+            for ch in kw.lower():
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                    self._goto[state][ch] = nxt
+                state = nxt
+            self._out[state].append(idx)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def finditer(self, text):
+        """Yield ``(start, end, keyword)`` for every occurrence, overlaps included.
+
+        Offsets index into ``text.lower()``, which has the same length as
+        ``text`` for everything but a handful of non-ASCII code points.
+        """
+        if not text:
+            return
+        lowered = text.lower()
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for end, ch in enumerate(lowered, 1):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for idx in out[state]:
+                kw = self.keywords[idx]
+                start = end - len(kw)
+                if self.word_boundaries and not _on_boundary(lowered, start, end):
+                    continue
+                yield start, end, kw
+
+    def find_all(self, text):
+        return list(self.finditer(text))
+
+    def counts(self, text):
+        return Counter(kw for _, _, kw in self.finditer(text))
+
+    def extract(self, text):
+        """Distinct keywords present in ``text``, in keyword-list order."""
+        found = {kw for _, _, kw in self.finditer(text)}
+        return [kw for kw in self.keywords if kw in found]
+
+
+def _on_boundary(text, start, end):
+    if start > 0 and text[start - 1].isalnum():
+        return False
+    if end < len(text) and text[end].isalnum():
+        return False
+    return True
+
+
+@lru_cache(maxsize=16)
+def compile_keywords(keywords, word_boundaries=False):
+    """Build (once) the matcher for a tuple of keywords."""
+    return KeywordMatcher(keywords, word_boundaries=word_boundaries)
@@ -0,0 +1,168 @@
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from config import CACHE_DIR
+
+PROFILE_DIR = os.path.join(CACHE_DIR, "profiles")
+PROFILERS = ("cprofile", "pyinstrument")
+
+# Histogram bucket upper bounds in milliseconds; anything slower lands in the last bucket
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; memory does not grow with the sample count."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(BUCKETS_MS, seconds * 1000)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q):
+        # Upper bound of the bucket holding the q-th sample, capped at the slowest one seen
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS_MS, self.counts):
+            seen += n
+            if n and seen >= rank:
+                return min(bound, self.max * 1000)
+        return self.max * 1000
+
+    def summary(self):
+        buckets = {f"le_{bound}ms": n for bound, n in zip(BUCKETS_MS, self.counts) if n}
+        if self.counts[-1]:
+            buckets[f"gt_{BUCKETS_MS[-1]}ms"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "total_s": round(self.total, 4),
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(0.50), 3),
+            "p95_ms": round(self.percentile(0.95), 3),
+            "p99_ms": round(self.percentile(0.99), 3),
+            "max_ms": round(self.max * 1000, 3),
+            "buckets": buckets,
+        }
+
+
+class Metrics:
+    """Thread-safe timers and counters for one collector run.
+
+    ``timer(name)`` records wall time into a per-name histogram (listing
+    fetch, article fetch, parse, keyword match, summarize, Supabase calls);
+    ``incr(name, n)`` adds to a counter (bytes downloaded, retries, rows
+    written). ``summary()`` is what gets stored with the ``scrape_runs`` row.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.timers = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds):
+        with self._lock:
+            histogram = self.timers.get(name)
+            if histogram is None:
+                histogram = self.timers[name] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def incr(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def duration(self):
+        return time.perf_counter() - self.started
+
+    def summary(self):
+        with self._lock:
+            return {
+                "duration_s": round(self.duration(), 3),
+                "timers": {name: histogram.summary() for name, histogram in sorted(self.timers.items())},
+                "counters": dict(sorted(self.counters.items())),
+            }
+
+    def report(self):
+        summary = self.summary()
+        print(f"⏱️ Run took {summary['duration_s']}s")
+        for name, stats in summary["timers"].items():
+            print(f"   {name}: {stats['count']} × mean {stats['mean_ms']} ms, p95 ≤ {stats['p95_ms']} ms, total {stats['total_s']}s")
+        for name, value in summary["counters"].items():
+            print(f"   {name}: {value}")
+
+
+@contextmanager
+def profiled(kind, name="run", profile_dir=PROFILE_DIR):
+    """Profile the enclosed block with cProfile or pyinstrument; ``kind=None`` does nothing.
+
+    cProfile follows every thread started inside the block; pyinstrument
+    only samples the calling thread. Results are written under ``profile_dir``.
+    """
+    if kind is None:
+        yield
+        return
+    if kind not in PROFILERS:
+        raise ValueError(f"Unknown profiler {kind!r}; expected one of {', '.join(PROFILERS)}")
+    os.makedirs(profile_dir, exist_ok=True)
+    path = os.path.join(profile_dir, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}")
+
+    if kind == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            raise SystemExit("pyinstrument is not installed: pip install pyinstrument")
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            with open(f"{path}.html", "w", encoding="utf-8") as f:
+                f.write(profiler.output_html())
+            print(profiler.output_text(unicode=True, color=False))
+            print(f"🔬 Profile written to {path}.html")
+        return
+
+    import cProfile
+    import pstats
+
+    profiles = [cProfile.Profile()]
+
+    def profile_thread(*_):
+        # Runs once as each new thread's profile hook, then hands over to cProfile
+        sys.setprofile(None)
+        profile = cProfile.Profile()
+        profiles.append(profile)
+        profile.enable()
+
+    threading.setprofile(profile_thread)
+    profiles[0].enable()
+    try:
+        yield
+    finally:
+        profiles[0].disable()
+        threading.setprofile(None)
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        stats.dump_stats(f"{path}.prof")
+        stats.sort_stats("cumulative").print_stats(25)
+        print(f"🔬 Profile written to {path}.prof")
@@ -1,7 +1,18 @@
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
+import hashlib
+import os
+from datetime import datetime
+from functools import lru_cache
+
+from config import KEYWORDS, MODEL_DIR
+
+# Bump when the training data or pipeline changes so stale artifacts are retrained
+MODEL_VERSION = 1
+
 
 def train_keyword_model(keywords):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+
     # Fraud examples
     X_fraud = keywords
     y_fraud = [1] * len(keywords)
@@ -22,4 +33,67 @@ def train_keyword_model(keywords):
     model = LogisticRegression()
     model.fit(X_tfidf, y)
 
-    return vectorizer, model
\ No newline at end of file
+    return vectorizer, model
+
+def keywords_fingerprint(keywords):
+    return hashlib.sha256("\n".join(keywords).encode("utf-8")).hexdigest()[:16]
+
+def model_path(version=MODEL_VERSION, model_dir=MODEL_DIR):
+    return os.path.join(model_dir, f"keyword_model_v{version}.joblib")
+
+def save_model(vectorizer, model, keywords, path=None):
+    import joblib
+
+    path = path or model_path()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    joblib.dump({
+        "version": MODEL_VERSION,
+        "keywords": keywords_fingerprint(keywords),
+        "trained_at": datetime.utcnow().isoformat(),
+        "vectorizer": vectorizer,
+        "model": model,
+    }, path)
+    return path
+
+def load_model(keywords, path=None):
+    """Load the saved artifact, retraining and saving it if missing or stale."""
+    import joblib
+
+    path = path or model_path()
+    if os.path.exists(path):
+        artifact = joblib.load(path)
+        if artifact.get("version") == MODEL_VERSION and artifact.get("keywords") == keywords_fingerprint(keywords):
+            return artifact["vectorizer"], artifact["model"]
+        print(f"♻️ Model artifact {path} is stale, retraining")
+
+    vectorizer, model = train_keyword_model(keywords)
+    save_model(vectorizer, model, keywords, path)
+    return vectorizer, model
+
+
+class KeywordScorer:
+    """Fraud probability for whole batches of article texts.
+
+    Texts are vectorized together into one sparse TF-IDF matrix and scored
+    with a single ``predict_proba`` call.
+    """
+
+    def __init__(self, vectorizer, model):
+        self.vectorizer = vectorizer
+        self.model = model
+        self._fraud_column = list(model.classes_).index(1)
+
+    def score(self, texts):
+        if not texts:
+            return []
+        probabilities = self.model.predict_proba(self.vectorizer.transform(texts))
+        return [round(float(p), 4) for p in probabilities[:, self._fraud_column]]
+
+@lru_cache(maxsize=1)
+def get_scorer():
+    return KeywordScorer(*load_model(KEYWORDS))
+
+
+if __name__ == "__main__":
+    vectorizer, model = train_keyword_model(KEYWORDS)
+    print(f"✅ Saved model artifact to {save_model(vectorizer, model, KEYWORDS)}")
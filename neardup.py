@@ -0,0 +1,179 @@
+import hashlib
+import os
+import re
+import zlib
+from uuid import uuid5, NAMESPACE_URL
+
+from config import CACHE_DIR
+from supabase_client import SyncedIndex
+
+NEARDUP_INDEX_PATH = os.path.join(CACHE_DIR, "neardup.sqlite3")
+
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+# Candidates from LSH are confirmed by estimated Jaccard similarity of their signatures
+SIMILARITY_THRESHOLD = 0.8
+# Bump when any parameter above changes; stored signatures are then rebuilt
+INDEX_VERSION = 1
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_TOKEN = re.compile(r"[a-z0-9]+")
+_permutations = None
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """32-bit hashes of the distinct word ``size``-grams of ``text``."""
+    tokens = _TOKEN.findall((text or "").lower())
+    if len(tokens) < size:
+        return {zlib.crc32(" ".join(tokens).encode("utf-8"))} if tokens else set()
+    return {zlib.crc32(" ".join(tokens[i:i + size]).encode("utf-8")) for i in range(len(tokens) - size + 1)}
+
+def _get_permutations():
+    # Fixed seed: signatures must stay comparable across runs and processes
+    global _permutations
+    if _permutations is None:
+        import numpy as np
+
+        rng = np.random.RandomState(1)
+        a = rng.randint(1, _MAX_HASH, size=NUM_PERM, dtype=np.uint64)
+        b = rng.randint(0, _MAX_HASH, size=NUM_PERM, dtype=np.uint64)
+        _permutations = (a[:, None], b[:, None])
+    return _permutations
+
+def minhash(text):
+    """MinHash signature (``NUM_PERM`` uint32 values) of ``text``, or ``None`` if it has no words."""
+    import numpy as np
+
+    hashes = shingles(text)
+    if not hashes:
+        return None
+    a, b = _get_permutations()
+    values = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+    return ((a * values + b) % _MERSENNE_PRIME & _MAX_HASH).min(axis=1).astype(np.uint32)
+
+def similarity(sig_a, sig_b):
+    return float((sig_a == sig_b).mean())
+
+def band_keys(signature):
+    data = signature.tobytes()
+    width = ROWS * 4
+    return [
+        (band, int.from_bytes(hashlib.blake2b(data[band * width:(band + 1) * width], digest_size=8).digest(), "big", signed=True))
+        for band in range(BANDS)
+    ]
+
+
+class NearDuplicateIndex(SyncedIndex):
+    """Local SQLite index of MinHash signatures for near-copy detection.
+
+    Each article's signature is split into ``BANDS`` bands that are stored as
+    bucket keys, so finding near-copies looks up ``BANDS`` buckets instead of
+    comparing against every stored article. Every article belongs to a
+    cluster named after its first-seen (canonical) article; ``assign``
+    returns an existing cluster when a candidate's estimated Jaccard
+    similarity is at least ``threshold``. Safe to share between threads.
+    """
+
+    SYNC_COLUMNS = ("url", "full_text")
+    SYNC_PAGE_SIZE = 200
+
+    def __init__(self, path=NEARDUP_INDEX_PATH, threshold=SIMILARITY_THRESHOLD):
+        super().__init__(path)
+        self.threshold = threshold
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if row is not None and int(row[0]) != INDEX_VERSION:
+            print("♻️ Near-duplicate index parameters changed, rebuilding it")
+            self.conn.executescript("DROP TABLE IF EXISTS signatures; DROP TABLE IF EXISTS bands; DELETE FROM sync_state;")
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (str(INDEX_VERSION),))
+        self.conn.execute("CREATE TABLE IF NOT EXISTS signatures (url TEXT PRIMARY KEY, cluster_id TEXT, canonical_url TEXT, signature BLOB)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS bands (band INTEGER, bucket INTEGER, url TEXT)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS bands_bucket ON bands (band, bucket)")
+        self.conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM signatures").fetchone()[0]
+
+    def cluster_of(self, url):
+        """``(cluster_id, canonical_url)`` for an indexed URL, else ``None``."""
+        with self._lock:
+            row = self.conn.execute("SELECT cluster_id, canonical_url FROM signatures WHERE url = ?", (url,)).fetchone()
+        return tuple(row) if row else None
+
+    def _best_match(self, signature, keys):
+        import numpy as np
+
+        # OR of equalities, so SQLite probes bands_bucket once per band instead of scanning
+        matches = " OR ".join("(band = ? AND bucket = ?)" for _ in keys)
+        params = [value for key in keys for value in key]
+        rows = self.conn.execute(
+            "SELECT url, cluster_id, canonical_url, signature FROM signatures "
+            f"WHERE url IN (SELECT url FROM bands WHERE {matches})",
+            params,
+        ).fetchall()
+        best = None
+        for url, cluster_id, canonical_url, blob in rows:
+            score = similarity(signature, np.frombuffer(blob, dtype=np.uint32))
+            if score >= self.threshold and (best is None or score > best[0]):
+                best = (score, cluster_id, canonical_url)
+        return best
+
+    def find(self, text):
+        """``(cluster_id, canonical_url, similarity)`` of the closest stored near-copy of ``text``, or ``None``."""
+        signature = minhash(text)
+        if signature is None:
+            return None
+        with self._lock:
+            best = self._best_match(signature, band_keys(signature))
+        return (best[1], best[2], best[0]) if best else None
+
+    def assign(self, url, text, commit=True):
+        """Index ``url`` and return its ``(cluster_id, canonical_url)``.
+
+        URLs already indexed keep their cluster. Otherwise the article joins
+        the cluster of its closest near-copy, or starts a new one. Returns
+        ``(None, None)`` for text without words.
+        """
+        existing = self.cluster_of(url)
+        if existing:
+            return existing
+        signature = minhash(text)
+        if signature is None:
+            return None, None
+        keys = band_keys(signature)
+        with self._lock:
+            best = self._best_match(signature, keys)
+            cluster_id, canonical_url = (best[1], best[2]) if best else (str(uuid5(NAMESPACE_URL, url)), url)
+            inserted = self.conn.execute(
+                "INSERT OR IGNORE INTO signatures (url, cluster_id, canonical_url, signature) VALUES (?, ?, ?, ?)",
+                (url, cluster_id, canonical_url, signature.tobytes()),
+            ).rowcount
+            if not inserted:
+                # Another thread indexed this URL first
+                return tuple(self.conn.execute("SELECT cluster_id, canonical_url FROM signatures WHERE url = ?", (url,)).fetchone())
+            self.conn.executemany("INSERT INTO bands (band, bucket, url) VALUES (?, ?, ?)", ((band, bucket, url) for band, bucket in keys))
+            if commit:
+                self.conn.commit()
+        return cluster_id, canonical_url
+
+    def index_page(self, page, client):
+        # Pages come oldest first, so canonicals are the first-seen articles
+        for article in page:
+            if article.get("url"):
+                self.assign(article["url"], article.get("full_text"), commit=False)
+
+    def stats(self):
+        with self._lock:
+            articles, clusters = self.conn.execute("SELECT COUNT(*), COUNT(DISTINCT cluster_id) FROM signatures").fetchone()
+        return {"articles": articles, "clusters": clusters, "near_copies": articles - clusters}
+
+
+if __name__ == "__main__":
+    with NearDuplicateIndex() as index:
+        synced = index.sync()
+        stats = index.stats()
+    print(f"✅ Indexed {synced} new articles: {stats['articles']} articles in {stats['clusters']} clusters ({stats['near_copies']} near-copies)")
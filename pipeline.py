@@ -0,0 +1,182 @@
+import queue
+import threading
+import time
+
+DEFAULT_QUEUE_SIZE = 64
+POLL_SECONDS = 0.1
+
+_DONE = object()
+
+
+class Stage:
+    def __init__(self, name, fn, workers=1, batch_size=1):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.inbox = None
+        self.processed = 0
+        self.busy_seconds = 0.0
+        self.max_depth = 0
+        self._depth_total = 0
+        self._lock = threading.Lock()
+
+    def record(self, depth, seconds, count=1):
+        with self._lock:
+            self.processed += count
+            self.busy_seconds += seconds
+            self.max_depth = max(self.max_depth, depth)
+            self._depth_total += depth * count
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "processed": self.processed,
+                "busy_s": round(self.busy_seconds, 3),
+                "queue_depth": self.inbox.qsize() if self.inbox is not None else 0,
+                "queue_avg": round(self._depth_total / self.processed, 2) if self.processed else 0.0,
+                "queue_max": self.max_depth,
+            }
+
+
+class Pipeline:
+    """Streaming stages on threads, connected by bounded queues.
+
+    Items from ``source`` flow through each ``stage`` in turn; a stage
+    function returning ``None`` drops the item, and the last stage's return
+    value is discarded. A stage with ``batch_size`` > 1 gets lists of up to
+    that many items (whatever is already queued, never waiting to fill one)
+    and returns a list of results. Every queue holds at most ``maxsize``
+    items, so a slow stage blocks the ones upstream of it and memory stays
+    flat however many items the source yields. ``stats()`` reports each stage's input queue
+    depth (current, average and peak), which points at the bottleneck: the
+    stage whose queue stays full.
+    """
+
+    def __init__(self, source, maxsize=DEFAULT_QUEUE_SIZE, name="source"):
+        self.source = source
+        self.source_name = name
+        self.maxsize = max(1, maxsize)
+        self.stages = []
+        self.produced = 0
+        self._stop = threading.Event()
+        self._error = None
+        self._lock = threading.Lock()
+        self._producers_left = {}
+
+    def stage(self, name, fn, workers=1, batch_size=1):
+        self.stages.append(Stage(name, fn, workers, batch_size))
+        return self
+
+    def stats(self):
+        return {stage.name: stage.stats() for stage in self.stages}
+
+    def depths(self):
+        return {stage.name: stage.inbox.qsize() if stage.inbox is not None else 0 for stage in self.stages}
+
+    def run(self):
+        if not self.stages:
+            raise ValueError("Pipeline needs at least one stage")
+        for i, stage in enumerate(self.stages):
+            stage.inbox = queue.Queue(maxsize=self.maxsize)
+            self._producers_left[i] = 1 if i == 0 else self.stages[i - 1].workers
+
+        threads = [threading.Thread(target=self._feed, name=self.source_name, daemon=True)]
+        for i, stage in enumerate(self.stages):
+            threads.extend(
+                threading.Thread(target=self._work, args=(i,), name=f"{stage.name}-{n}", daemon=True)
+                for n in range(stage.workers)
+            )
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if self._error is not None:
+            raise self._error
+        return self.stats()
+
+    def _put(self, q, item):
+        # Blocks while the queue is full (backpressure) unless another stage failed
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q):
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=POLL_SECONDS)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _fail(self, error):
+        with self._lock:
+            if self._error is None:
+                self._error = error
+        self._stop.set()
+
+    def _finished(self, i):
+        # Last producer for stage i closes its queue with one marker per worker
+        with self._lock:
+            self._producers_left[i] -= 1
+            last = self._producers_left[i] == 0
+        if last:
+            for _ in range(self.stages[i].workers):
+                self._put(self.stages[i].inbox, _DONE)
+
+    def _feed(self):
+        try:
+            for item in self.source:
+                if not self._put(self.stages[0].inbox, item):
+                    return
+                self.produced += 1
+        except Exception as e:
+            self._fail(e)
+            return
+        self._finished(0)
+
+    def _take(self, stage, first):
+        # Top up a batch from items already queued; returns (batch, saw end marker)
+        batch = [first]
+        while len(batch) < stage.batch_size:
+            try:
+                item = stage.inbox.get_nowait()
+            except queue.Empty:
+                break
+            if item is _DONE:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _work(self, i):
+        stage = self.stages[i]
+        outbox = self.stages[i + 1].inbox if i + 1 < len(self.stages) else None
+        done = False
+        while not done:
+            depth = stage.inbox.qsize()
+            item = self._get(stage.inbox)
+            if item is _DONE:
+                break
+            start = time.perf_counter()
+            try:
+                if stage.batch_size > 1:
+                    batch, done = self._take(stage, item)
+                    results = stage.fn(batch)
+                else:
+                    batch, results = [item], [stage.fn(item)]
+            except Exception as e:
+                self._fail(e)
+                return
+            stage.record(depth, time.perf_counter() - start, count=len(batch))
+            for result in results:
+                if result is not None and outbox is not None and not self._put(outbox, result):
+                    return
+        if self._stop.is_set():
+            return
+        if outbox is not None:
+            self._finished(i + 1)
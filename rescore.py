@@ -0,0 +1,181 @@
+import json
+import os
+from uuid import uuid5, NAMESPACE_URL
+
+from config import CACHE_DIR, KEYWORDS, MATCH_WORD_BOUNDARIES
+from cooccurrence import load_or_rebuild
+from loader import build_clean_row, clusters_with_clean_rows, join_keywords
+from utils import chunked, extract_keywords, published_date, summarize_text
+
+CHECKPOINT_PATH = os.path.join(CACHE_DIR, "rescore_checkpoint.json")
+RESCORE_PAGE_SIZE = 200
+RAW_COLUMNS = ["url", "title", "full_text", "keywords", "source"]
+CLEAN_COLUMNS = ("id", "url", "keywords", "summary", "score", "threat_category", "published_at", "cluster_id", "created_at")
+
+
+def keywords_version():
+    from models import keywords_fingerprint
+    return keywords_fingerprint(KEYWORDS)
+
+def load_checkpoint(path=CHECKPOINT_PATH):
+    """The saved cursor and counters, or ``None`` if there is none for the current KEYWORDS."""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("keywords") != keywords_version():
+        print("♻️ KEYWORDS changed since the checkpoint was written, starting over")
+        return None
+    return checkpoint
+
+def save_checkpoint(checkpoint, path=CHECKPOINT_PATH):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+def analyze_texts(texts):
+    # Runs in worker processes: keywords and summary per stored full_text
+    return [(extract_keywords(text, KEYWORDS, word_boundaries=MATCH_WORD_BOUNDARIES), summarize_text(text)) for text in texts]
+
+def clean_row_changed(old, new):
+    fields = ("keywords", "summary", "threat_category", "model_score", "cluster_id")
+    if any(field in new and old.get(field) != new[field] for field in fields):
+        return True
+    return old.get("score") is None or float(old["score"]) != new["score"] or old.get("published_at") is None
+
+
+class Rescorer:
+    """Recomputes keywords, score and summary for stored articles.
+
+    ``raw_articles`` is read page by page in ``(created_at, id)`` order and
+    each page costs one ``in_("url", ...)`` lookup on ``clean_articles``.
+    Only rows whose values changed are written back, with one upsert per
+    table per page; clean rows of articles that no longer match any keyword
+    are deleted. The cursor is checkpointed after every page, so an
+    interrupted run resumes where it stopped. With a ``neardup`` index, a near-copy
+    gets no clean row when its cluster already has one, as at ingest.
+    """
+
+    def __init__(self, client=None, page_size=RESCORE_PAGE_SIZE, processes=0, scorer=None, cooccurrence=None, checkpoint_path=CHECKPOINT_PATH, neardup=None):
+        if client is None:
+            from supabase_client import supabase as client
+        self.client = client
+        self.page_size = page_size
+        self.processes = processes
+        self.scorer = scorer
+        self.cooccurrence = cooccurrence if cooccurrence is not None else load_or_rebuild(client=self.client)
+        self.checkpoint_path = checkpoint_path
+        self.neardup = neardup
+        self._pool = None
+
+    def _analyze(self, texts):
+        if not self.processes:
+            return analyze_texts(texts)
+        if self._pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+            from multiprocessing import get_context
+            self._pool = ProcessPoolExecutor(max_workers=self.processes, mp_context=get_context("spawn"))
+        from collector import PROCESS_CHUNK_SIZE
+        results = self._pool.map(analyze_texts, chunked(texts, PROCESS_CHUNK_SIZE))
+        return [result for chunk in results for result in chunk]
+
+    def rescore_page(self, rows):
+        """Write back the changes for one page of raw rows; returns (raw updated, clean updated, clean deleted)."""
+        urls = [row["url"] for row in rows]
+        existing = self.client.table("clean_articles").select(*CLEAN_COLUMNS).in_("url", urls).execute().data
+        clean_by_url = {row["url"]: row for row in existing}
+
+        analyzed = self._analyze([row["full_text"] or "" for row in rows])
+        clusters = [self.neardup.assign(row["url"], row["full_text"]) if self.neardup is not None else (None, None) for row in rows]
+
+        # As at ingest, a near-copy only loses its clean row to another row of its cluster;
+        # rows on this page are decided below, oldest first, so their old rows do not count
+        clustered = {cluster_id: canonical_url for row, (keywords_found, _), (cluster_id, canonical_url) in zip(rows, analyzed, clusters)
+                     if keywords_found and canonical_url not in (None, row["url"])}
+        displayed = clusters_with_clean_rows(self.client, clustered) if clustered else {}
+        for urls in displayed.values():
+            urls.difference_update(clean_by_url)
+
+        raw_rows, clean_rows, clean_texts, deletes = [], [], [], []
+        for row, (keywords_found, summary), (cluster_id, canonical_url) in zip(rows, analyzed, clusters):
+            old = clean_by_url.get(row["url"])
+            if join_keywords(keywords_found) != (row.get("keywords") or ""):
+                raw_rows.append({**row, "keywords": join_keywords(keywords_found)})
+
+            if not keywords_found or (cluster_id and displayed.get(cluster_id)):
+                if old is not None:
+                    deletes.append(old)
+                continue
+            if cluster_id:
+                displayed.setdefault(cluster_id, set()).add(row["url"])
+
+            new = build_clean_row(
+                row["id"], summary, keywords_found, row["title"], row["url"],
+                clean_id=old["id"] if old else str(uuid5(NAMESPACE_URL, row["url"])),
+                published_at=(old or {}).get("published_at") or published_date(row["url"]),
+            )
+            if cluster_id:
+                new["cluster_id"] = cluster_id
+            if old is not None:
+                new["created_at"] = old["created_at"]
+            clean_rows.append((old, new))
+            clean_texts.append(row["full_text"])
+
+        if self.scorer is not None:
+            for (_, new), model_score in zip(clean_rows, self.scorer.score(clean_texts)):
+                new["model_score"] = model_score
+        clean_rows = [(old, new) for old, new in clean_rows if old is None or clean_row_changed(old, new)]
+
+        if raw_rows:
+            self.client.table("raw_articles").upsert(raw_rows, on_conflict="url").execute()
+        if clean_rows:
+            self.client.table("clean_articles").upsert([new for _, new in clean_rows], on_conflict="url").execute()
+        if deletes:
+            self.client.table("clean_articles").delete().in_("id", [old["id"] for old in deletes]).execute()
+
+        for old, new in clean_rows:
+            if old is not None:
+                self.cooccurrence.remove(old["keywords"].split(","))
+            self.cooccurrence.add(new["keywords"].split(","))
+        for old in deletes:
+            self.cooccurrence.remove(old["keywords"].split(","))
+        return len(raw_rows), len(clean_rows), len(deletes)
+
+    def run(self, restart=False):
+        from supabase_client import iter_pages
+
+        checkpoint = None if restart else load_checkpoint(self.checkpoint_path)
+        if checkpoint is None:
+            checkpoint = {"keywords": keywords_version(), "cursor": None, "scanned": 0, "raw_updated": 0, "clean_updated": 0, "clean_deleted": 0}
+        else:
+            print(f"⏯️ Resuming rescore after {checkpoint['scanned']} rows")
+
+        cursor = tuple(checkpoint["cursor"]) if checkpoint["cursor"] else None
+        try:
+            for rows in iter_pages("raw_articles", RAW_COLUMNS, page_size=self.page_size, after=cursor, client=self.client):
+                raw_updated, clean_updated, clean_deleted = self.rescore_page(rows)
+                checkpoint["scanned"] += len(rows)
+                checkpoint["raw_updated"] += raw_updated
+                checkpoint["clean_updated"] += clean_updated
+                checkpoint["clean_deleted"] += clean_deleted
+                checkpoint["cursor"] = [rows[-1]["created_at"], rows[-1]["id"]]
+                # Counts before the cursor, so re-running a page never adjusts them twice
+                self.cooccurrence.save()
+                save_checkpoint(checkpoint, self.checkpoint_path)
+                print(f"🔁 Rescored {checkpoint['scanned']} articles ({clean_updated} clean rows updated, {clean_deleted} removed in this page)")
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        print(
+            f"✅ Rescore complete: {checkpoint['scanned']} articles, {checkpoint['raw_updated']} raw and "
+            f"{checkpoint['clean_updated']} clean rows updated, {checkpoint['clean_deleted']} clean rows removed"
+        )
+        return checkpoint
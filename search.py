@@ -0,0 +1,114 @@
+import os
+import sqlite3
+
+from config import CACHE_DIR
+from supabase_client import SyncedIndex
+
+SEARCH_INDEX_PATH = os.path.join(CACHE_DIR, "search.sqlite3")
+SEARCH_LIMIT = 1000
+# bm25 weights for (title, summary, full_text): a hit in the title outranks one deep in the body
+BM25_WEIGHTS = (10.0, 4.0, 1.0)
+SNIPPET_TOKENS = 16
+
+
+def quote_terms(query):
+    """``query`` as plain words: every term quoted, so FTS5 operators and punctuation lose their meaning."""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+
+
+class SearchIndex(SyncedIndex):
+    """Local SQLite FTS5 index over article titles, summaries and full text.
+
+    Queries use FTS5 syntax: ``"credential stuffing"`` for a phrase,
+    ``ransom*`` for a prefix, ``AND``/``OR``/``NOT``; input that is not
+    valid syntax is searched as plain words. Results are ranked by bm25,
+    weighting title over summary over body. ``sync`` pulls only rows of
+    ``raw_articles`` newer than the last synced cursor. Safe to share
+    between threads.
+    """
+
+    SYNC_COLUMNS = ("url", "title", "full_text")
+    SYNC_PAGE_SIZE = 200
+
+    def __init__(self, path=SEARCH_INDEX_PATH):
+        super().__init__(path)
+        # docs maps each URL to the rowid of its FTS row, so re-indexing an article replaces it
+        self.conn.execute("CREATE TABLE IF NOT EXISTS docs (id INTEGER PRIMARY KEY, url TEXT UNIQUE)")
+        self.conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS articles USING fts5(title, summary, full_text, tokenize='porter unicode61')")
+        self.conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def add_many(self, articles):
+        """Index (or re-index) dicts with ``url``, ``title``, ``summary`` and ``full_text``."""
+        with self._lock:
+            for article in articles:
+                self.conn.execute("INSERT OR IGNORE INTO docs (url) VALUES (?)", (article["url"],))
+                doc_id = self.conn.execute("SELECT id FROM docs WHERE url = ?", (article["url"],)).fetchone()[0]
+                self.conn.execute("DELETE FROM articles WHERE rowid = ?", (doc_id,))
+                self.conn.execute(
+                    "INSERT INTO articles (rowid, title, summary, full_text) VALUES (?, ?, ?, ?)",
+                    (doc_id, article.get("title") or "", article.get("summary") or "", article.get("full_text") or ""),
+                )
+            self.conn.commit()
+
+    def _match(self, sql, before, query, after):
+        # Input that is not valid FTS5 syntax is retried as plain words
+        try:
+            return self.conn.execute(sql, (*before, query, *after)).fetchall()
+        except sqlite3.OperationalError:
+            return self.conn.execute(sql, (*before, quote_terms(query), *after)).fetchall()
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        """Best matches first, as dicts with ``url``, ``title`` and ``rank`` (lower is better)."""
+        if not query.strip():
+            return []
+        with self._lock:
+            rows = self._match(
+                "SELECT d.url, a.title, bm25(articles, ?, ?, ?) AS rank FROM articles a JOIN docs d ON d.id = a.rowid "
+                "WHERE articles MATCH ? ORDER BY rank LIMIT ?",
+                BM25_WEIGHTS, query, (limit,),
+            )
+        return [{"url": url, "title": title, "rank": rank} for url, title, rank in rows]
+
+    def snippets(self, query, urls):
+        """``{url: snippet}`` with the terms of ``query`` in bold; kept separate from ``search`` because
+        building snippets costs far more than ranking, so only the results on screen should pay for it."""
+        urls = list(urls)
+        if not query.strip() or not urls:
+            return {}
+        placeholders = ",".join("?" * len(urls))
+        with self._lock:
+            rows = self._match(
+                "SELECT d.url, snippet(articles, -1, '**', '**', ' … ', ?) FROM articles a JOIN docs d ON d.id = a.rowid "
+                f"WHERE articles MATCH ? AND d.url IN ({placeholders})",
+                (SNIPPET_TOKENS,), query, urls,
+            )
+        return dict(rows)
+
+    def index_page(self, page, client):
+        # Summaries live in clean_articles; unflagged articles have none
+        urls = [article["url"] for article in page if article.get("url")]
+        clean = client.table("clean_articles").select("url", "summary").in_("url", urls).execute().data if urls else []
+        summaries = {row["url"]: row["summary"] for row in clean}
+        self.add_many({**article, "summary": summaries.get(article["url"])} for article in page if article.get("url"))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Sync the local full-text index from raw_articles and search it")
+    parser.add_argument("query", nargs="?", help='FTS5 query, e.g. "credential stuffing" or ransom* NOT crypto')
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    with SearchIndex() as index:
+        synced = index.sync()
+        print(f"✅ Search index: {len(index)} articles ({synced} synced)")
+        if args.query:
+            hits = index.search(args.query, limit=args.limit)
+            snippets = index.snippets(args.query, [hit["url"] for hit in hits])
+            for hit in hits:
+                print(f"{hit['rank']:8.2f}  {hit['title']}\n          {hit['url']}\n          {snippets.get(hit['url'], '')}")
@@ -1,40 +1,25 @@
 import streamlit as st
-from supabase_client import supabase
+from dashboard_data import load_articles, load_latest_run, load_runs, load_cooccurrence, network_layout, search_articles, search_snippets, invalidate
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 from collections import Counter
-import altair as alt
 import datetime
-import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
-import networkx as nx
-from itertools import combinations
 
 st.set_page_config(page_title="Cybercrime Monitor", layout="wide")
 st.title("🕵️ Cybercrime Article Monitor")
 
-def fetch_articles():
-    response = supabase.table("clean_articles").select("*").execute()
-    return response.data
+col_refresh, col_rebuild = st.columns(2)
+if col_refresh.button("🔄 Refresh data"):
+    invalidate()
+# Rows changed in place (rescore, deletes) keep their created_at, so only a rebuild picks them up
+if col_rebuild.button("♻️ Rebuild article snapshot"):
+    invalidate(rebuild=True)
 
-@st.cache_data
-def fetch_raw_article(raw_id):
-    response = supabase.table("raw_articles").select("title, url").eq("id", raw_id).limit(1).execute()
-    return response.data[0] if response.data else {"title": "Unknown", "url": "#"}
-
-articles = fetch_articles()
-if not articles:
+df = load_articles()
+if df.empty:
     st.info("No articles found.")
 else:
-    df = pd.DataFrame(articles)
-    # Normalize created_at early so all tabs/charts get datetime objects
-    df["created_at"] = pd.to_datetime(df.get("created_at", None), errors='coerce')
-    df["url"] = df["raw_id"].apply(lambda rid: fetch_raw_article(rid)["url"])
-    df = df[df["keywords"].str.strip() != ""]
-    df = df.sort_values("created_at", ascending=False).drop_duplicates(subset="url")
-    df["keyword_count"] = df["keywords"].apply(lambda x: len(x.split(", ")) if x and x.strip() else 0)
     df_sorted = df.sort_values(by="keyword_count", ascending=False)
 
     # 📊 Metrics: Scraped from latest run, Flagged from displayed data
@@ -42,8 +27,8 @@ else:
     col1, col2 = st.columns(2)
 
     # Scraped (this run) from scrape_runs
-    latest_run = supabase.table("scrape_runs").select("*").order("created_at", desc=True).limit(1).execute()
-    scraped_this_run = latest_run.data[0]["scraped_count"] if latest_run.data else 0
+    latest_run = load_latest_run()
+    scraped_this_run = latest_run["scraped_count"] if latest_run else 0
 
     # Flagged (displayed cumulative) from df
     flagged_displayed = int(df["flagged"].sum())
@@ -56,6 +41,8 @@ else:
 
     with tab1:
         st.markdown("### 📰 Flagged Articles")
+
+        search_query = st.text_input("🔎 Search titles, summaries and article text", placeholder='e.g. "credential stuffing" or ransom* NOT crypto').strip()
         
         # 🔍 Filters
         col_filter1, col_filter2, col_filter3 = st.columns(3)
@@ -93,72 +80,72 @@ else:
                 else:
                     start_date = end_date = date_range
 
-        for _, article in df_sorted.iterrows():
-            # Apply filters
-            if keyword_filter and keyword_filter not in article["keywords"].lower():
-                continue
-            if article["score"] < min_score:
-                continue
-            article_date = pd.to_datetime(article["created_at"]).date()
-            if not (pd.to_datetime(start_date).date() <= article_date <= pd.to_datetime(end_date).date()):
-                continue
-            
-            raw = fetch_raw_article(article["raw_id"])
-            st.markdown("### " + raw["title"])
+        # One vectorized mask over all articles; created_day is parsed once at load
+        mask = (df_sorted["score"] >= min_score) & df_sorted["created_day"].between(pd.Timestamp(start_date), pd.Timestamp(end_date))
+        if keyword_filter:
+            mask &= df_sorted["keywords"].str.lower().str.contains(keyword_filter, regex=False)
+        filtered = df_sorted[mask]
+        if search_query:
+            # Ranked by the local full-text index instead of keyword count
+            hits = search_articles(search_query)
+            filtered = filtered.merge(hits, on="url").sort_values("rank")
+
+        # 📄 Pagination: only the current page of cards is rendered
+        col_page1, col_page2 = st.columns(2)
+        with col_page1:
+            page_size = st.selectbox("Articles per page", options=[10, 25, 50, 100], index=1)
+        page_count = max(1, -(-len(filtered) // page_size))
+        with col_page2:
+            page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1)
+        start = (page - 1) * page_size
+        page_df = filtered.iloc[start:start + page_size]
+        st.caption(f"Showing {start + 1 if len(page_df) else 0}–{start + len(page_df)} of {len(filtered)} articles")
+        # Snippets are built for the visible page only
+        snippets = search_snippets(search_query, tuple(page_df["url"])) if search_query else {}
+
+        for article in page_df.to_dict("records"):
+            st.markdown("### " + article["title"])
             st.markdown(f"**Summary:** {article['summary']}")
+            if article["url"] in snippets:
+                st.markdown(f"**Match:** {snippets[article['url']]}")
             keywords = article["keywords"] if article["keywords"].strip() else "—"
             if keywords == "—":
                 st.warning("⚠️ No keywords detected for this article.")
             st.markdown(f"**Keywords:** `{keywords}`")
             st.markdown(f"**Score:** {article['score']}")
             st.markdown(f"**Keyword Count:** {article['keyword_count']}")
-            st.markdown(f"[🔗 Read full article]({raw['url']})")
+            st.markdown(f"[🔗 Read full article]({article['url']})")
             st.markdown("---")
 
     with tab2:
         st.markdown("### 📊 Threat Intelligence Visuals")
         
         # Sub-tabs for different visualizations
-        visual_tabs = st.tabs(["Keywords Network", "Score Distribution", "Threat Trend", "Threat Categories"])
+        visual_tabs = st.tabs(["Keywords Network", "Score Distribution", "Threat Trend", "Threat Categories", "Run Durations"])
         
         # --- 1. KEYWORD NETWORK GRAPH ---
         with visual_tabs[0]:
             st.markdown("#### 🔗 Keyword Co-occurrence Network")
             st.markdown("Shows which keywords appear together in flagged articles (larger nodes = more frequent).")
             
-            flagged_df = df[df["flagged"] == True].copy()
-            if not flagged_df.empty and len(flagged_df) > 0:
-                # Build co-occurrence graph
-                all_keywords = []
-                for kws in flagged_df["keywords"].dropna():
-                    keywords_list = [kw.strip().lower() for kw in kws.split(",") if kw.strip()]
-                    all_keywords.append(keywords_list)
+            flagged_df = df[df["flagged"] == True]
+            if not flagged_df.empty:
+                # Counts are kept up to date by the collector; only the top 20 keywords are laid out
+                matrix = load_cooccurrence(flagged_df["keywords"].tolist())
+                top_kw_names = matrix.top_keywords(20)
                 
-                # Create network graph
-                G = nx.Graph()
-                for kw_list in all_keywords:
-                    for kw in kw_list:
-                        G.add_node(kw)
-                    # Add edges for co-occurrence
-                    for kw1, kw2 in combinations(kw_list, 2):
-                        if G.has_edge(kw1, kw2):
-                            G[kw1][kw2]["weight"] += 1
-                        else:
-                            G.add_edge(kw1, kw2, weight=1)
-                
-                if len(G.nodes()) > 0:
-                    # Filter to top 20 keywords by degree for readability
-                    top_keywords = sorted(G.degree(), key=lambda x: x[1], reverse=True)[:20]
-                    top_kw_names = [k[0] for k in top_keywords]
-                    G_filtered = G.subgraph(top_kw_names)
-                    
-                    # Plotly network visualization
-                    pos = nx.spring_layout(G_filtered, k=0.5, iterations=50, seed=42)
+                if top_kw_names:
+                    edges = matrix.edges(top_kw_names)
+                    pos = network_layout(matrix.fingerprint(), top_kw_names, edges)
+                    degree = Counter()
+                    for kw1, kw2, _ in edges:
+                        degree[kw1] += 1
+                        degree[kw2] += 1
                     
                     edge_x, edge_y = [], []
-                    for edge in G_filtered.edges():
-                        x0, y0 = pos[edge[0]]
-                        x1, y1 = pos[edge[1]]
+                    for kw1, kw2, _ in edges:
+                        x0, y0 = pos[kw1]
+                        x1, y1 = pos[kw2]
                         edge_x.extend([x0, x1, None])
                         edge_y.extend([y0, y1, None])
                     
@@ -171,12 +158,12 @@ else:
                     )
                     
                     node_x, node_y, node_text, node_size = [], [], [], []
-                    for node in G_filtered.nodes():
+                    for node in top_kw_names:
                         x, y = pos[node]
                         node_x.append(x)
                         node_y.append(y)
                         node_text.append(node.title())
-                        node_size.append(max(G_filtered.degree(node) * 5, 10))
+                        node_size.append(max(degree[node] * 5, 10))
                     
                     node_trace = go.Scatter(
                         x=node_x, y=node_y,
@@ -233,31 +220,12 @@ else:
             st.markdown("#### 📈 Flagged Articles Trend Over Time")
             st.markdown("Cumulative flagged articles by publication date with trend line.")
             
-            df_timeline = df[df["flagged"] == True].copy()
+            df_timeline = df[df["flagged"] == True]
             if len(df_timeline) > 0:
-                # Extract publication date from URL (format: /YYYY/MM/DD/)
-                def extract_date_from_url(url):
-                    try:
-                        if url and 'techcrunch.com' in url:
-                            parts = url.split('/')
-                            # Look for YYYY/MM/DD pattern in URL
-                            for i, part in enumerate(parts):
-                                if len(part) == 4 and part.isdigit() and i+2 < len(parts):
-                                    year, month, day = parts[i], parts[i+1], parts[i+2]
-                                    if year.isdigit() and month.isdigit() and day.isdigit():
-                                        try:
-                                            return pd.to_datetime(f"{year}-{month}-{day}")
-                                        except:
-                                            return None
-                    except:
-                        pass
-                    return None
-                
-                df_timeline["pub_date"] = df_timeline["url"].apply(extract_date_from_url)
-                df_timeline = df_timeline[df_timeline["pub_date"].notna()]
+                df_timeline = df_timeline[df_timeline["published_at"].notna()]
                 
                 if len(df_timeline) > 0:
-                    daily_counts = df_timeline.groupby(df_timeline["pub_date"].dt.date).size().reset_index(name="count")
+                    daily_counts = df_timeline.groupby(df_timeline["published_at"].dt.date).size().reset_index(name="count")
                     daily_counts.columns = ["date", "count"]
                     daily_counts = daily_counts.sort_values("date")
                     daily_counts["cumulative"] = daily_counts["count"].cumsum()
@@ -300,7 +268,7 @@ else:
                     st.markdown("**Daily Breakdown:**")
                     st.dataframe(daily_counts.sort_values("date", ascending=False), use_container_width=True)
                 else:
-                    st.info("Could not extract publication dates from article URLs.")
+                    st.info("No publication dates available for flagged articles.")
             else:
                 st.info("No flagged articles to visualize.")
         
@@ -309,34 +277,9 @@ else:
             st.markdown("#### 🎯 Top Threat Categories")
             st.markdown("Breakdown of threat types based on flagged article keywords.")
             
-            flagged_df = df[df["flagged"] == True].copy()
+            flagged_df = df[df["flagged"] == True]
             if len(flagged_df) > 0:
-                # Define threat categories
-                threat_categories = {
-                    "Data Breach": ["data breach", "data leak", "breach", "exposed", "stolen data"],
-                    "Phishing": ["phishing", "phishing page", "fake website", "social engineering"],
-                    "Malware": ["malware", "ransomware", "botnet", "trojan", "virus"],
-                    "Fraud": ["fraud", "scam", "money laundering", "credit card fraud", "fake invoice"],
-                    "Account Compromise": ["account takeover", "unauthorized access", "account irregularity"],
-                    "Other": []
-                }
-                
-                # Categorize each article
-                categories = []
-                for _, row in flagged_df.iterrows():
-                    keywords = row["keywords"].lower() if row["keywords"] else ""
-                    found = False
-                    for cat, patterns in threat_categories.items():
-                        if cat != "Other" and any(pattern in keywords for pattern in patterns):
-                            categories.append(cat)
-                            found = True
-                            break
-                    if not found:
-                        categories.append("Other")
-                
-                cat_counts = Counter(categories)
-                cat_df = pd.DataFrame(list(cat_counts.items()), columns=["Category", "Count"])
-                cat_df = cat_df.sort_values("Count", ascending=False)
+                cat_df = flagged_df["threat_category"].value_counts().rename_axis("Category").reset_index(name="Count")
                 
                 fig = px.pie(
                     cat_df,
@@ -352,4 +295,39 @@ else:
                 st.markdown("**Breakdown by Category:**")
                 st.dataframe(cat_df.sort_values("Count", ascending=False), use_container_width=True)
             else:
-                st.info("No flagged articles to visualize.")
\ No newline at end of file
+                st.info("No flagged articles to visualize.")
+        
+        # --- 5. COLLECTOR RUN DURATIONS ---
+        with visual_tabs[4]:
+            st.markdown("#### ⏱️ Collector Run Durations")
+            st.markdown("Wall time of each scrape run, split by where the time went.")
+            
+            runs = load_runs()
+            if not runs.empty:
+                runs = runs.sort_values("created_at")
+                fig = go.Figure()
+                fig.add_trace(go.Scatter(
+                    x=runs["created_at"],
+                    y=runs["duration_s"],
+                    mode="lines+markers",
+                    name="Run duration",
+                    line=dict(color="#FF6B6B", width=3),
+                ))
+                fig.update_layout(xaxis=dict(title="Run"), yaxis=dict(title="Seconds"), height=400, hovermode="x unified")
+                st.plotly_chart(fig, use_container_width=True)
+                
+                # Stage totals overlap (fetches run concurrently), so they can add up to more than the run
+                stage_columns = [c for c in runs.columns if c not in ("scraped_count", "flagged_count", "duration_s", "created_at", "id")]
+                if stage_columns:
+                    stages = runs.melt(id_vars="created_at", value_vars=stage_columns, var_name="Stage", value_name="Seconds").dropna()
+                    fig = px.bar(stages, x="created_at", y="Seconds", color="Stage", title="Time Spent per Stage (summed across threads)")
+                    fig.update_layout(xaxis=dict(title="Run"), height=450)
+                    st.plotly_chart(fig, use_container_width=True)
+                
+                st.markdown("**Recent Runs:**")
+                st.dataframe(
+                    runs[["created_at", "duration_s", "scraped_count", "flagged_count"]].sort_values("created_at", ascending=False),
+                    use_container_width=True,
+                )
+            else:
+                st.info("No instrumented runs recorded yet.")
@@ -1,4 +1,121 @@
-from supabase import create_client, Client
+import os
+import sqlite3
+import threading
+
 from config import SUPABASE_URL, SUPABASE_KEY
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
\ No newline at end of file
+DEFAULT_PAGE_SIZE = 1000
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Create the Supabase client on first use; importing this module stays cheap."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from supabase import create_client
+                _client = create_client(SUPABASE_URL, SUPABASE_KEY)
+    return _client
+
+
+class _LazyClient:
+    # Forwards attribute access to the real client, built on first query
+    def __getattr__(self, name):
+        return getattr(get_client(), name)
+
+    def __repr__(self):
+        return "<lazy Supabase client>"
+
+
+supabase = _LazyClient()
+
+
+def iter_pages(table, columns, page_size=DEFAULT_PAGE_SIZE, after=None, filters=None, client=None):
+    """Yield lists of rows from ``table`` ordered by the ``(created_at, id)`` keyset.
+
+    Only ``columns`` are selected (``created_at`` and ``id`` are always added
+    for the cursor). ``after`` resumes strictly after a ``(created_at, id)``
+    pair, and ``filters`` is an optional callable that narrows the query,
+    e.g. ``lambda q: q.eq("flagged", True)``. Each request is bounded by
+    ``page_size`` so large tables never hit PostgREST's row cap.
+    """
+    client = client or supabase
+    columns = list(dict.fromkeys([*columns, "created_at", "id"]))
+    cursor = after
+    while True:
+        query = client.table(table).select(*columns)
+        if filters:
+            query = filters(query)
+        if cursor:
+            created_at, row_id = cursor
+            query = query.or_(f'created_at.gt."{created_at}",and(created_at.eq."{created_at}",id.gt."{row_id}")')
+        rows = query.order("created_at").order("id").limit(page_size).execute().data
+        if rows:
+            yield rows
+        if len(rows) < page_size:
+            return
+        cursor = (rows[-1]["created_at"], rows[-1]["id"])
+
+def iter_rows(table, columns, **kwargs):
+    for page in iter_pages(table, columns, **kwargs):
+        yield from page
+
+def iter_frames(table, columns, **kwargs):
+    import pandas as pd
+
+    for page in iter_pages(table, columns, **kwargs):
+        yield pd.DataFrame(page)
+
+
+class SyncedIndex:
+    """Local SQLite file kept in step with a Supabase table through the ``iter_pages`` keyset.
+
+    Subclasses create their own tables after ``__init__`` and implement
+    ``index_page(page, client)``; ``sync`` feeds it only rows newer than the
+    last stored ``(created_at, id)`` cursor and saves the cursor after each
+    page. Use ``self._lock`` around ``self.conn``, which is shared between
+    threads.
+    """
+
+    SYNC_TABLE = "raw_articles"
+    SYNC_COLUMNS = ("url",)
+    SYNC_PAGE_SIZE = DEFAULT_PAGE_SIZE
+
+    def __init__(self, path):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS sync_state (id INTEGER PRIMARY KEY CHECK (id = 1), created_at TEXT, row_id TEXT)")
+        self.conn.commit()
+
+    def index_page(self, page, client):
+        raise NotImplementedError
+
+    def sync(self, client=None):
+        """Index rows added since the last sync; returns how many were read."""
+        client = client or supabase
+        with self._lock:
+            row = self.conn.execute("SELECT created_at, row_id FROM sync_state WHERE id = 1").fetchone()
+        cursor = tuple(row) if row else None
+        added = 0
+        for page in iter_pages(self.SYNC_TABLE, self.SYNC_COLUMNS, page_size=self.SYNC_PAGE_SIZE, after=cursor, client=client):
+            self.index_page(page, client)
+            cursor = (page[-1]["created_at"], page[-1]["id"])
+            with self._lock:
+                self.conn.execute("INSERT OR REPLACE INTO sync_state (id, created_at, row_id) VALUES (1, ?, ?)", cursor)
+                self.conn.commit()
+            added += len(page)
+        return added
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,48 @@
+import pytest
+import requests
+
+from benchmarks.fake_server import FakeServer
+from fetcher import CircuitOpenError, Fetcher
+
+
+@pytest.fixture
+def server(request):
+    with FakeServer(**getattr(request, "param", {})) as server:
+        yield server
+
+
+def make_fetcher(**kwargs):
+    return Fetcher(workers=1, session=requests.Session(), backoff_base=0.001, **kwargs)
+
+
+def test_redirect_loop_gives_back_the_host_slot(server):
+    with make_fetcher(per_host=2) as fetcher:
+        for _ in range(3):
+            with pytest.raises(requests.exceptions.TooManyRedirects):
+                fetcher.get(f"{server.url}/redirect-loop/story/")
+        # Would block forever in HostLimiter.acquire if the slots had leaked
+        assert fetcher.get(f"{server.url}/2025/01/01/story/").status_code == 200
+        limiter = fetcher.limiter(server.url)
+        assert limiter.in_flight == 0
+        assert limiter.opened_at is None
+
+
+@pytest.mark.parametrize("server", [{"fail_first": 2}], indirect=True)
+def test_server_errors_are_retried_until_success(server):
+    with make_fetcher() as fetcher:
+        resp = fetcher.get(f"{server.url}/2025/01/01/story/")
+        assert resp.status_code == 200
+        assert fetcher.metrics.counters["retries"] == 2
+        assert server.stats["errors"] == 2
+
+
+@pytest.mark.parametrize("server", [{"error_rate": 1.0}], indirect=True)
+def test_breaker_opens_after_consecutive_failures(server):
+    with make_fetcher(max_retries=0) as fetcher:
+        url = f"{server.url}/2025/01/01/story/"
+        for _ in range(5):
+            assert fetcher.get(url).status_code == 503
+        with pytest.raises(CircuitOpenError):
+            fetcher.get(url)
+        assert server.stats["requests"] == 5
+        assert fetcher.metrics.counters["circuit_open_rejections"] == 1
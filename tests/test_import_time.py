@@ -0,0 +1,12 @@
+import os
+
+from benchmarks.import_time import BUDGETS_MS, check
+
+# Wall-clock budgets are multiplied by this, like ``--scale`` on the script, so a slow
+# or busy host doesn't fail at random; the eager-import check is exact either way
+SCALE = float(os.environ.get("IMPORT_TIME_SCALE", "2"))
+
+
+def test_import_time_budgets():
+    failures = check({module: budget * SCALE for module, budget in BUDGETS_MS.items()})
+    assert not failures, "\n".join(failures)
@@ -1,8 +1,51 @@
 import re
+from datetime import datetime, timedelta
+
+from config import THREAT_CATEGORIES, DEFAULT_THREAT_CATEGORY
+from matcher import compile_keywords
+
+URL_DATE = re.compile(r"/(\d{4})/(\d{2})/(\d{2})/")
+RELATIVE_DATE = re.compile(r"(\d+)\s+(minute|hour|day|week)s?\s+ago")
+LISTING_DATE = re.compile(r"[A-Z][a-z]{2} \d{1,2}, \d{4}")
 
 def summarize_text(text, max_sentences=3):
     sentences = re.split(r'(?<=[.!?]) +', text)
     return ' '.join(sentences[:max_sentences])
 
-def extract_keywords(text, keywords):
-    return [kw for kw in keywords if kw in text.lower()]
\ No newline at end of file
+def extract_keywords(text, keywords, word_boundaries=False):
+    return compile_keywords(tuple(keywords), word_boundaries).extract(text)
+
+def chunked(items, size):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def published_date(url, listing_date=None, now=None):
+    """ISO publication date from a ``/YYYY/MM/DD/`` URL, else from listing meta text.
+
+    Listing cards show either "3 days ago" style text (relative to ``now``)
+    or "Nov 11, 2025"; anything else gives ``None``.
+    """
+    match = URL_DATE.search(url or "")
+    if match:
+        try:
+            return datetime(*map(int, match.groups())).date().isoformat()
+        except ValueError:
+            pass
+    if not listing_date:
+        return None
+    match = RELATIVE_DATE.search(listing_date)
+    if match:
+        amount, unit = int(match.group(1)), match.group(2)
+        return ((now or datetime.utcnow()) - timedelta(**{unit + "s": amount})).date().isoformat()
+    match = LISTING_DATE.search(listing_date)
+    if match:
+        return datetime.strptime(match.group(0), "%b %d, %Y").date().isoformat()
+    return None
+
+def threat_category(keywords_found, categories=THREAT_CATEGORIES):
+    found = ", ".join(kw.lower() for kw in keywords_found)
+    for category, patterns in categories.items():
+        if any(pattern in found for pattern in patterns):
+            return category
+    return DEFAULT_THREAT_CATEGORY